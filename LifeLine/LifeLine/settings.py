@@ -108,6 +108,19 @@ DATABASES = {
     )
 }
 
+# Milestone evaluation runs inline on every Goal save by default. Set
+# MILESTONES_DEFERRED=true to queue it for `manage.py milestone_worker`.
+# The worker also gives existing users their (locked) rows for newly
+# created milestones; unlocks never wait for it.
+MILESTONES_DEFERRED = os.environ.get("MILESTONES_DEFERRED", "False").lower() == "true"
+
+# Goal progress history is buffered per process and written in batches of
+# PROGRESS_LOG_BUFFER_SIZE or every PROGRESS_LOG_FLUSH_INTERVAL seconds.
+# PROGRESS_LOG_SYNC=true writes each entry during the request instead.
+PROGRESS_LOG_SYNC = os.environ.get("PROGRESS_LOG_SYNC", "False").lower() == "true"
+PROGRESS_LOG_BUFFER_SIZE = int(os.environ.get("PROGRESS_LOG_BUFFER_SIZE", "200"))
+PROGRESS_LOG_FLUSH_INTERVAL = float(os.environ.get("PROGRESS_LOG_FLUSH_INTERVAL", "5"))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
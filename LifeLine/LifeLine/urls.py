@@ -26,13 +26,16 @@ urlpatterns = [
     path('goals/', include('goals.urls')),
 
     path("reports/", goal_views.reports_page, name="reports"),
+    path("reports/summary/", goal_views.report_summary, name="report_summary"),
     path("reports/timeline/", goal_views.report_timeline),
     path("reports/status/", goal_views.report_status),
     path("reports/categories/", goal_views.report_categories),
     path("reports/completions/", goal_views.report_completions),
+    path("reports/activity/", goal_views.report_activity),
 
     path('', user_views.landing, name='landing'),
     path('admin-dashboard/', user_views.admin_dashboard, name='admin_dashboard'),
+    path('admin-dashboard/more/', user_views.admin_dashboard_more, name='admin_dashboard_more'),
 
     path('profile/', user_views.profile_view, name='profile'),
 ]
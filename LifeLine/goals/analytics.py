@@ -0,0 +1,67 @@
+"""
+Daily platform-wide analytics snapshots for staff.
+
+``snapshot_analytics`` computes the day's totals with a handful of
+aggregate queries and stores them in one AnalyticsSnapshot row; the staff
+analytics page only ever reads those rows.
+
+Goal totals are summed from the per-user stats tables (one row per user,
+or per user and category) instead of counting the goals table, and
+active users and progress updates come from UserActivityDay, the source
+of truth for daily activity (see goals.rollups). Stats rows still
+missing for users with goals are built first, so a snapshot never
+undercounts.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import AnalyticsSnapshot, UserActivityDay, UserCategoryStats, UserGoalStats
+from .stats import build_missing_user_stats
+
+
+def snapshot_analytics(day=None):
+    """Write (or overwrite) the snapshot for ``day``, today by default."""
+    day = day or timezone.localdate()
+    day_start = timezone.make_aware(datetime.combine(day, time.min))
+    build_missing_user_stats()
+
+    users = User.objects.aggregate(
+        total_users=Count("id"),
+        new_users=Count("id", filter=Q(
+            date_joined__gte=day_start, date_joined__lt=day_start + timedelta(days=1)
+        )),
+    )
+    activity = UserActivityDay.objects.filter(
+        day__gt=day - timedelta(days=7), day__lte=day
+    ).aggregate(
+        active_users=Count("user", distinct=True, filter=Q(day=day)),
+        weekly_active_users=Count("user", distinct=True),
+        progress_updates=Sum("updates", filter=Q(day=day)),
+    )
+    goals = UserGoalStats.objects.aggregate(
+        total_goals=Sum("total_goals"),
+        not_started_goals=Sum("not_started_goals"),
+        in_progress_goals=Sum("in_progress_goals"),
+        completed_goals=Sum("completed_goals"),
+    )
+    categories = dict(
+        UserCategoryStats.objects.filter(total__gt=0)
+        .values("category")
+        .annotate(goals=Sum("total"))
+        .order_by("-goals", "category")
+        .values_list("category", "goals")
+    )
+
+    values = {**users, **activity, **goals}
+    snapshot, _ = AnalyticsSnapshot.objects.update_or_create(
+        day=day,
+        defaults={
+            **{field: value or 0 for field, value in values.items()},
+            "categories": categories,
+        },
+    )
+    return snapshot
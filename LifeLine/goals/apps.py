@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class GoalsConfig(AppConfig):
@@ -6,4 +7,7 @@ class GoalsConfig(AppConfig):
     name = 'goals'
 
     def ready(self):
-        import goals.signals
\ No newline at end of file
+        import goals.signals
+        from goals.search import install_sqlite_fts
+
+        post_migrate.connect(install_sqlite_fts, sender=self)
@@ -0,0 +1,118 @@
+"""
+Retention tiers for the goal progress history.
+
+GoalProgressLog grows with every slider drag, so old rows are thinned out:
+
+* newer than ``raw_days``: every update is kept,
+* up to ``daily_days``: only the last update per goal per day,
+* older: only the last update per goal per ISO week.
+
+Compaction walks the history one day (or week) window at a time. Each
+window is deleted in transactions of at most ``batch_size`` rows and a
+Watermark records the finished windows, so a run can be interrupted and
+picked up again, and no transaction holds locks for long.
+
+Rows are never compacted past the rollup watermark (``goals.rollups``):
+the daily and weekly rollups must have counted every update before the
+superseded ones are deleted.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import GoalProgressLog, Watermark
+from .rollups import WATERMARK as ROLLUP_WATERMARK, week_of
+
+DEFAULT_RAW_DAYS = 30
+DEFAULT_DAILY_DAYS = 365
+DEFAULT_BATCH_SIZE = 5000
+
+
+def _midnight(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _superseded(start, end):
+    """Rows in [start, end) with a later row for the same goal in the window."""
+    window = GoalProgressLog.objects.filter(created_at__gte=start, created_at__lt=end)
+    later = window.filter(goal_id=OuterRef("goal_id")).filter(
+        Q(created_at__gt=OuterRef("created_at"))
+        | Q(created_at=OuterRef("created_at"), id__gt=OuterRef("id"))
+    )
+    return window.filter(Exists(later))
+
+
+def _compact_window(start, end, batch_size):
+    deleted = 0
+    superseded = _superseded(start, end).order_by().values_list("id", flat=True)
+    while True:
+        with transaction.atomic():
+            ids = list(superseded[:batch_size])
+            if not ids:
+                return deleted
+            # The range keeps the delete to one partition on Postgres
+            deleted += GoalProgressLog.objects.filter(
+                id__in=ids, created_at__gte=start, created_at__lt=end
+            ).delete()[0]
+
+
+def compact_tier(name, older_than, weekly, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Keep one row per goal per day (or week, if ``weekly``) before ``older_than``.
+
+    Returns the number of rows deleted.
+    """
+    rollup_mark = Watermark.objects.filter(name=ROLLUP_WATERMARK).values_list(
+        "value", flat=True
+    ).first()
+    if rollup_mark is None:
+        return 0  # Nothing has been rolled up yet
+    cutoff = min(older_than, rollup_mark)
+
+    mark, _ = Watermark.objects.get_or_create(name=f"progress_compaction_{name}")
+    step = timedelta(days=7 if weekly else 1)
+    deleted = 0
+    start = mark.value
+    while True:
+        # Jump over stretches with no history at all
+        rows = GoalProgressLog.objects.filter(created_at__lt=cutoff)
+        if start is not None:
+            rows = rows.filter(created_at__gte=start)
+        first = rows.order_by("created_at").values_list("created_at", flat=True).first()
+        if first is None:
+            break
+        day = timezone.localdate(first)
+        window_start = _midnight(week_of(day) if weekly else day)
+        if start is not None:
+            window_start = max(window_start, start)
+        end = _midnight(timezone.localdate(window_start) + step)
+        if end > cutoff:
+            break  # Only whole windows, or the last row kept could still change
+
+        deleted += _compact_window(window_start, end, batch_size)
+        mark.value = start = end
+        mark.save(update_fields=["value", "updated_at"])
+    return deleted
+
+
+def compact_progress_log(
+    raw_days=DEFAULT_RAW_DAYS, daily_days=DEFAULT_DAILY_DAYS, batch_size=DEFAULT_BATCH_SIZE
+):
+    """Apply every retention tier. Returns {tier name: rows deleted}."""
+    now = timezone.now()
+    return {
+        "daily": compact_tier("daily", now - timedelta(days=raw_days), False, batch_size),
+        "weekly": compact_tier("weekly", now - timedelta(days=daily_days), True, batch_size),
+    }
+
+
+def vacuum_progress_log():
+    """Reclaim the deleted rows' space on Postgres (outside a transaction)."""
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(f"VACUUM (ANALYZE) {GoalProgressLog._meta.db_table}")
+    return True
@@ -0,0 +1,70 @@
+"""
+Conditional GET for the per-user JSON endpoints.
+
+Every write that can change what a user's reports or goal lists show
+bumps ``UserGoalStats.generation`` and ``changed_at`` (see goals.stats).
+Those two columns are the validators: the ETag is built from the
+generation, today's date and the query string, and Last-Modified is
+``changed_at`` or the start of today, whichever is later (the query
+string is already part of the URL the browser caches under).
+A matching ``If-None-Match`` or ``If-Modified-Since`` is answered with
+304 after a single primary-key read, before the view runs any aggregate.
+"""
+
+import hashlib
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from .models import UserGoalStats
+
+
+def _version(request, user_id=None):
+    """(generation, changed_at) for the user whose data the view returns."""
+    if user_id is None:
+        user_id = request.user.id
+    cache = request.__dict__.setdefault("_goal_data_versions", {})
+    if user_id not in cache:
+        cache[user_id] = (
+            UserGoalStats.objects.filter(user_id=user_id)
+            .values_list("generation", "changed_at")
+            .first()
+        )
+    return cache[user_id]
+
+
+def data_generation(request, user_id=None):
+    """The generation read for the validators, so views need not read it again."""
+    version = _version(request, user_id)
+    return version[0] if version else None
+
+
+def _etag(request, *args, user_id=None, **kwargs):
+    version = _version(request, user_id)
+    if version is None:
+        return None  # No stats row yet; the view builds it
+    # Date-relative windows (e.g. the last 12 weeks) move at midnight
+    query = hashlib.md5(request.get_full_path().encode()).hexdigest()[:12]
+    return f"{user_id or request.user.id}-{version[0]}-{timezone.localdate()}-{query}"
+
+
+def _last_modified(request, *args, user_id=None, **kwargs):
+    version = _version(request, user_id)
+    if version is None:
+        return None
+    # Like the ETag, stale from midnight on even without a write
+    midnight = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+    return max(version[1], midnight)
+
+
+def user_data_condition(view):
+    """
+    ETag / Last-Modified handling for a view of one user's goal data.
+
+    Apply under ``login_required``. Responses are private and always
+    revalidated, so the browser never shows data older than the last write.
+    """
+    view = condition(etag_func=_etag, last_modified_func=_last_modified)(view)
+    return cache_control(private=True, no_cache=True)(view)
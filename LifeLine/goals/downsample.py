@@ -0,0 +1,50 @@
+"""
+Largest-Triangle-Three-Buckets (LTTB) downsampling for chart series.
+
+LTTB keeps the first and last points and, from each of ``points - 2``
+equal-sized buckets in between, the point forming the largest triangle
+with the previously kept point and the next bucket's average. Peaks and
+steps survive, so a few hundred points draw the same shape as thousands.
+
+The bucket averages and each bucket's triangle areas are numpy array
+operations; only the walk from bucket to bucket is a Python loop, as each
+choice depends on the previous one.
+"""
+
+import numpy as np
+
+
+def lttb(x, y, points):
+    """
+    Indices of the points LTTB keeps, in order.
+
+    ``x`` must be increasing. All indices are returned when the series
+    already has ``points`` or fewer points, or ``points`` is below 3.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if points < 3 or n <= points:
+        return np.arange(n)
+
+    # Bucket i covers [edges[i], edges[i + 1]) of the interior points
+    edges = np.linspace(1, n - 1, points - 1).astype(int)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    # The "next bucket" of the last bucket is the final point
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    kept = np.empty(points, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Twice the triangle areas; the factor doesn't change the argmax
+        area = np.abs(
+            (x[a] - next_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y[i] - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
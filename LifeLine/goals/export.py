@@ -0,0 +1,87 @@
+"""
+Streaming export of a user's goals and their progress history.
+
+Rows are read with ``values_list(...).iterator(chunk_size=...)``, so no
+model instances are built and only one chunk is held at a time (a
+server-side cursor on Postgres), and each row is written to the response
+as soon as it is formatted. Memory stays flat however long the history is.
+
+There is one row per progress log entry; goals without any history
+appear once with empty log columns.
+"""
+
+import csv
+import json
+
+from .models import Goal
+from .progress_log import progress_log_buffer
+
+CHUNK_SIZE = 2000
+
+COLUMNS = [
+    "goal_id",
+    "title",
+    "category",
+    "status",
+    "progress",
+    "target_date",
+    "created_at",
+    "logged_progress",
+    "logged_at",
+]
+
+# Goal fields, then the joined GoalProgressLog fields (LEFT OUTER JOIN)
+FIELDS = [
+    "id",
+    "title",
+    "category",
+    "status",
+    "progress",
+    "target_date",
+    "created_at",
+    "goalprogresslog__progress",
+    "goalprogresslog__created_at",
+]
+
+
+def export_rows(user_id):
+    """Tuples in COLUMNS order, goal by goal, each goal's history oldest first."""
+    # Entries still waiting in this process's buffer belong in the export
+    progress_log_buffer.flush()
+    return (
+        Goal.objects.filter(user_id=user_id)
+        .order_by("id", "goalprogresslog__created_at", "goalprogresslog__id")
+        .values_list(*FIELDS)
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+def _text(value):
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(COLUMNS)
+    for row in rows:
+        yield writer.writerow([_text(value) for value in row])
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        record = dict(zip(COLUMNS, (_text(value) for value in row)))
+        for key in ("target_date", "logged_progress", "logged_at"):
+            if record[key] == "":
+                record[key] = None
+        yield json.dumps(record) + "\n"
@@ -0,0 +1,145 @@
+"""
+Deferred milestone work, drained by ``manage.py milestone_worker``.
+
+With ``MILESTONES_DEFERRED`` on, Goal saves only enqueue a MilestoneJob
+and the worker evaluates the users in batches, so request latency no
+longer depends on milestone rules.
+
+Creating a Milestone always enqueues a MilestoneProvisionJob: giving
+every existing user a locked row for it is too slow for the admin
+request that saved it, so the worker does it a chunk of users at a time.
+Unlocks do not wait for it: ``_unlock`` inserts any row still missing.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .milestones import evaluate_users, provision_user_milestones
+from .models import MilestoneJob, MilestoneProvisionJob
+
+# A claim older than this belongs to a worker that died; the job is retried
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def milestones_deferred():
+    return getattr(settings, "MILESTONES_DEFERRED", False)
+
+
+def enqueue_milestone_evaluation(user_ids):
+    """
+    Queue users for evaluation; users already waiting are coalesced.
+
+    Re-enqueueing a waiting user moves its ``enqueued_at`` forward and
+    releases any claim, which tells the worker evaluating it not to
+    delete the job afterwards.
+    """
+    now = timezone.now()
+    MilestoneJob.objects.bulk_create(
+        # One row per user: Postgres refuses to upsert the same row twice
+        [MilestoneJob(user_id=user_id, enqueued_at=now) for user_id in dict.fromkeys(user_ids)],
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=["enqueued_at", "claimed_at"],
+    )
+
+
+def _lock_sqlite_queue():
+    """Take SQLite's write lock now rather than at the first real write."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"UPDATE {MilestoneJob._meta.db_table} SET id = id WHERE 1 = 0")
+
+
+def _claim_jobs(batch_size):
+    """
+    Mark up to ``batch_size`` unclaimed jobs as claimed, in a short transaction.
+
+    On Postgres ``FOR UPDATE SKIP LOCKED`` keeps two workers off the same
+    rows. SQLite has no row locks, so the claim starts by taking the
+    database write lock; a second worker waits only for the claim itself.
+    Elsewhere, run a single worker.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = MilestoneJob.objects.filter(
+            Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - CLAIM_TIMEOUT)
+        ).order_by("enqueued_at", "id")
+        if connection.features.has_select_for_update_skip_locked:
+            jobs = jobs.select_for_update(skip_locked=True)
+        elif connection.vendor == "sqlite":
+            _lock_sqlite_queue()
+        batch = list(jobs.values_list("id", "user_id", "enqueued_at")[:batch_size])
+        if batch:
+            MilestoneJob.objects.filter(id__in=[job_id for job_id, _, _ in batch]).update(
+                claimed_at=now
+            )
+    return batch
+
+
+def run_milestone_jobs(batch_size=100):
+    """
+    Claim up to ``batch_size`` jobs, evaluate them and delete them.
+
+    Evaluation runs outside the claim transaction, so a request
+    re-enqueueing a user never waits for it. A job re-enqueued meanwhile
+    is kept for the next run, since the evaluation may have missed that
+    change. A worker that dies mid-batch leaves its claims behind; they
+    are picked up again after ``CLAIM_TIMEOUT``.
+    Returns the number of jobs processed.
+    """
+    batch = _claim_jobs(batch_size)
+    if not batch:
+        return 0
+
+    evaluate_users([user_id for _, user_id, _ in batch])
+
+    claimed = Q()
+    for job_id, _, enqueued_at in batch:
+        claimed |= Q(id=job_id, enqueued_at__lte=enqueued_at)
+    MilestoneJob.objects.filter(claimed).delete()
+    return len(batch)
+
+
+def enqueue_milestone_provisioning(milestone_ids):
+    """Queue new milestones for provisioning to every existing user."""
+    MilestoneProvisionJob.objects.bulk_create(
+        [MilestoneProvisionJob(milestone_id=milestone_id) for milestone_id in milestone_ids],
+        ignore_conflicts=True,
+    )
+
+
+def run_provision_jobs(chunk_size=500):
+    """
+    Provision the next ``chunk_size`` users of the oldest pending milestone.
+
+    Progress is stored on the job after every chunk, so an interrupted
+    worker resumes where it stopped. Users registered meanwhile are
+    provisioned for every milestone on creation. Returns the number of
+    users provisioned.
+    """
+    while True:
+        with transaction.atomic():
+            jobs = MilestoneProvisionJob.objects.order_by("enqueued_at", "id")
+            if connection.features.has_select_for_update_skip_locked:
+                jobs = jobs.select_for_update(skip_locked=True)
+            job = jobs.first()
+            if job is None:
+                return 0
+
+            chunk = list(
+                User.objects.filter(id__gt=job.last_user_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:chunk_size]
+            )
+            if not chunk:
+                job.delete()
+                continue  # Finished; try the next milestone
+
+            provision_user_milestones(chunk, [job.milestone_id])
+            job.last_user_id = chunk[-1]
+            job.save(update_fields=["last_user_id"])
+        return len(chunk)
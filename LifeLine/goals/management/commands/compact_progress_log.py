@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from goals.compaction import (
+    DEFAULT_BATCH_SIZE, DEFAULT_DAILY_DAYS, DEFAULT_RAW_DAYS,
+    compact_progress_log, vacuum_progress_log,
+)
+
+
+class Command(BaseCommand):
+    help = "Thin out old goal progress history according to the retention tiers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--raw-days", type=int, default=DEFAULT_RAW_DAYS,
+            help="Keep every update this many days.",
+        )
+        parser.add_argument(
+            "--daily-days", type=int, default=DEFAULT_DAILY_DAYS,
+            help="Keep the last update per goal per day this many days, then per week.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+            help="Rows deleted per transaction.",
+        )
+        parser.add_argument(
+            "--vacuum", action="store_true",
+            help="VACUUM (ANALYZE) the log table afterwards (Postgres only).",
+        )
+
+    def handle(self, *args, raw_days, daily_days, batch_size, vacuum=False, **options):
+        if daily_days < raw_days:
+            daily_days = raw_days
+        deleted = compact_progress_log(raw_days, daily_days, batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted['daily']} row(s) to daily and "
+            f"{deleted['weekly']} row(s) to weekly resolution."
+        ))
+        if vacuum and vacuum_progress_log():
+            self.stdout.write("Vacuumed the progress log.")
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from goals.jobs import run_milestone_jobs, run_provision_jobs
+
+
+class Command(BaseCommand):
+    help = "Drain the deferred milestone evaluation and new-milestone provisioning queues."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=100,
+            help="Jobs claimed per transaction.",
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=500,
+            help="Users provisioned per transaction for a new milestone.",
+        )
+        parser.add_argument(
+            "--sleep", type=float, default=2.0,
+            help="Seconds to wait when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Exit once the queue is empty instead of polling.",
+        )
+
+    def handle(self, *args, batch_size=100, chunk_size=500, sleep=2.0, once=False, **options):
+        total = provisioned = 0
+        try:
+            while True:
+                # Rows first, so evaluations can unlock new milestones
+                users = run_provision_jobs(chunk_size)
+                provisioned += users
+                processed = run_milestone_jobs(batch_size)
+                total += processed
+                if users or processed:
+                    continue
+                if once:
+                    break
+                time.sleep(sleep)
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {total} milestone job(s), provisioned {provisioned} user(s)."
+        ))
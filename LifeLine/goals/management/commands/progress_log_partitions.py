@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from goals.partitions import (
+    add_months, create_partitions, drop_partitions_before, is_partitioned, month_start,
+)
+
+
+class Command(BaseCommand):
+    help = "Create upcoming monthly GoalProgressLog partitions and drop expired ones (Postgres)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead", type=int, default=3,
+            help="Months to create partitions for beyond the current one.",
+        )
+        parser.add_argument(
+            "--keep-months", type=int, default=None,
+            help="Drop partitions older than this many whole months. Nothing is dropped by default.",
+        )
+
+    def handle(self, *args, ahead=3, keep_months=None, **options):
+        if not is_partitioned():
+            self.stdout.write("The progress log is not partitioned on this database.")
+            return
+
+        for name in create_partitions(ahead):
+            self.stdout.write(f"Created {name}")
+
+        if keep_months is not None:
+            cutoff = add_months(month_start(timezone.localdate()), -keep_months)
+            for name in drop_partitions_before(cutoff):
+                self.stdout.write(f"Dropped {name}")
+
+        self.stdout.write(self.style.SUCCESS("Progress log partitions are up to date."))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from goals.milestones import backfill_milestones
+
+
+class Command(BaseCommand):
+    help = "Create missing (locked) UserMilestone rows for every user."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--milestone", type=int, action="append", dest="milestone_ids",
+            help="Only provision this milestone id (can be repeated).",
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=500,
+            help="Users provisioned per bulk insert.",
+        )
+
+    def handle(self, *args, milestone_ids=None, chunk_size=500, **options):
+        processed = backfill_milestones(milestone_ids, chunk_size=chunk_size)
+        self.stdout.write(self.style.SUCCESS(f"Provisioned milestones for {processed} user(s)."))
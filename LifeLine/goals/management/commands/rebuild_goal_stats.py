@@ -0,0 +1,32 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from goals.pagination import id_chunks
+from goals.stats import rebuild_user_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the materialized per-user goal statistics from the goals table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user", type=int, action="append", dest="user_ids",
+            help="Only rebuild this user id (can be repeated).",
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=1000,
+            help="Users rebuilt per transaction.",
+        )
+
+    def handle(self, *args, user_ids=None, chunk_size=1000, **options):
+        if user_ids:
+            written = rebuild_user_stats(user_ids)
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {written} user(s)."))
+            return
+
+        # Walk users in primary-key order so each transaction stays small
+        written = 0
+        for chunk in id_chunks(User.objects.all(), chunk_size):
+            written += rebuild_user_stats(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {written} user(s)."))
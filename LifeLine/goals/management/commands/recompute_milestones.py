@@ -0,0 +1,73 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from goals.milestones import evaluate_users
+from goals.pagination import id_chunks
+
+
+def _init_worker():
+    # Spawned (non-forked) workers start without Django configured
+    if not apps.ready:
+        django.setup()
+    # Never share the parent's database connections across processes
+    connections.close_all()
+
+
+def _evaluate_chunk(user_ids):
+    unlocked = evaluate_users(user_ids)
+    return len(user_ids), sum(len(m) for m in unlocked.values())
+
+
+class Command(BaseCommand):
+    help = "Re-evaluate milestones for every user, e.g. after milestones are added or changed."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size", type=int, default=1000,
+            help="Users evaluated per grouped aggregate query.",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=1,
+            help="Process pool size; 1 evaluates in this process.",
+        )
+
+    def handle(self, *args, chunk_size=1000, workers=1, **options):
+        started = time.monotonic()
+        users = unlocked = 0
+
+        def report(done, newly_unlocked):
+            nonlocal users, unlocked
+            users += done
+            unlocked += newly_unlocked
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f"{users} users, {unlocked} unlocks, "
+                f"{users / elapsed if elapsed else 0:.0f} users/s"
+            )
+
+        if workers <= 1:
+            for chunk in id_chunks(User.objects.all(), chunk_size):
+                report(*_evaluate_chunk(chunk))
+        else:
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                # Keep a bounded number of chunks in flight
+                pending = []
+                for chunk in id_chunks(User.objects.all(), chunk_size):
+                    pending.append(pool.submit(_evaluate_chunk, chunk))
+                    if len(pending) >= workers * 2:
+                        report(*pending.pop(0).result())
+                for future in pending:
+                    report(*future.result())
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Recomputed milestones for {users} user(s) in {elapsed:.1f}s "
+            f"({users / elapsed if elapsed else 0:.0f} users/s), {unlocked} new unlock(s)."
+        ))
@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from goals.rollups import DEFAULT_LAG, rollup_progress
+
+
+class Command(BaseCommand):
+    help = "Fold new goal progress history into the daily and weekly rollups."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lag", type=float, default=DEFAULT_LAG.total_seconds(),
+            help="Seconds to stay behind now, so buffered log rows can land first.",
+        )
+
+    def handle(self, *args, lag=DEFAULT_LAG.total_seconds(), **options):
+        folded = rollup_progress(timedelta(seconds=lag))
+        self.stdout.write(self.style.SUCCESS(f"Rolled up {folded} progress update(s)."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from goals.analytics import snapshot_analytics
+
+
+class Command(BaseCommand):
+    help = "Store today's platform-wide analytics snapshot for the staff analytics page."
+
+    def handle(self, *args, **options):
+        snapshot = snapshot_analytics()
+        self.stdout.write(self.style.SUCCESS(
+            f"Snapshot for {snapshot.day}: {snapshot.total_users} users, "
+            f"{snapshot.total_goals} goals, {snapshot.active_users} active today."
+        ))
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def provision_existing_users(apps, schema_editor):
+    """Create the locked UserMilestone rows the evaluator now relies on."""
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    Milestone = apps.get_model("goals", "Milestone")
+    UserMilestone = apps.get_model("goals", "UserMilestone")
+
+    milestone_ids = list(Milestone.objects.values_list("id", flat=True))
+    last_id = 0
+    while True:
+        chunk = list(
+            User.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:500]
+        )
+        if not chunk:
+            break
+        UserMilestone.objects.bulk_create(
+            [
+                UserMilestone(user_id=user_id, milestone_id=milestone_id)
+                for user_id in chunk
+                for milestone_id in milestone_ids
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+        last_id = chunk[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0012_user_goal_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(provision_existing_users, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 19:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0015_user_activity_streak'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usergoalstats',
+            name='generation',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations
+
+# Postgres only: SQLite gets its FTS5 shadow table from the post_migrate
+# hook in goals.search, and other backends fall back to icontains.
+FORWARD_SQL = [
+    """
+    ALTER TABLE goals_goal ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple'::regconfig, coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX goals_goal_search_vector_gin ON goals_goal USING gin (search_vector)",
+]
+
+REVERSE_SQL = [
+    "DROP INDEX IF EXISTS goals_goal_search_vector_gin",
+    "ALTER TABLE goals_goal DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def add_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for sql in FORWARD_SQL:
+            schema_editor.execute(sql)
+
+
+def remove_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for sql in REVERSE_SQL:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0016_user_stats_generation'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_vector, remove_search_vector),
+    ]
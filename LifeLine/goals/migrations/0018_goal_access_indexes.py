@@ -0,0 +1,56 @@
+# Generated by Django 5.2.6 on 2026-10-17 19:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class AddIndexConcurrentlyOnPostgres(migrations.AddIndex):
+    """
+    AddIndex that uses CREATE INDEX CONCURRENTLY on Postgres, so building it
+    on a large goals table does not block writes. Other backends get a
+    plain CREATE INDEX.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.add_index(model, self.index, concurrently=True)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.remove_index(model, self.index, concurrently=True)
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('goals', '0017_goal_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyOnPostgres(
+            model_name='goal',
+            index=models.Index(fields=['user', 'status'], name='goal_user_status_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='goal',
+            index=models.Index(fields=['user', 'category'], name='goal_user_category_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='goal',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='goal_user_created_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='goal',
+            index=models.Index(fields=['user', 'progress', 'id'], name='goal_user_progress_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-17 19:22
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0018_goal_access_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='goalprogresslog',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='goalprogresslog',
+            index=models.Index(fields=['goal', 'created_at'], name='progresslog_goal_created_idx'),
+        ),
+    ]
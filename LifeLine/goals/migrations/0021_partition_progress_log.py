@@ -0,0 +1,130 @@
+from datetime import date
+
+from django.db import migrations
+
+# Postgres only: see goals.partitions. SQLite keeps the plain table.
+TABLE = "goals_goalprogresslog"
+SEQUENCE = f"{TABLE}_part_id_seq"
+MONTHS_AHEAD = 3
+
+
+def _month_index(day):
+    return day.year * 12 + day.month - 1
+
+
+def _month(index):
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _names(schema_editor):
+    """
+    The constraint and index names Django gave the plain table in 0011.
+
+    Both directions end up with these names, so later AlterField/RemoveIndex
+    operations on GoalProgressLog find what Django's state expects.
+    """
+    return {
+        "pkey": f"{TABLE}_pkey",
+        "check": f"{TABLE}_progress_check",
+        "fk": schema_editor._create_index_name(TABLE, ["goal_id"], suffix="_fk_goals_goal_id"),
+        "goal_idx": schema_editor._create_index_name(TABLE, ["goal_id"]),
+    }
+
+
+def _swap_in(schema_editor, names):
+    """Replace the old table by {TABLE}_new and give it Django's names."""
+    execute = schema_editor.execute
+    execute(
+        f"INSERT INTO {TABLE}_new (id, progress, created_at, goal_id) "
+        f"SELECT id, progress, created_at, goal_id FROM {TABLE}"
+    )
+    execute(f"DROP TABLE {TABLE}")
+    execute(f"ALTER TABLE {TABLE}_new RENAME TO {TABLE}")
+    for name in ("pkey", "check", "fk"):
+        execute(f"ALTER TABLE {TABLE} RENAME CONSTRAINT new_{name} TO {names[name]}")
+    execute(f"CREATE INDEX {names['goal_idx']} ON {TABLE} (goal_id)")
+    execute(f"CREATE INDEX progresslog_goal_created_idx ON {TABLE} (goal_id, created_at)")
+
+
+def _columns(pkey):
+    # Constraints get temporary names while the old table still holds the real ones
+    return f"""
+        progress integer NOT NULL,
+        created_at timestamp with time zone NOT NULL,
+        goal_id bigint NOT NULL,
+        CONSTRAINT new_pkey PRIMARY KEY ({pkey}),
+        CONSTRAINT new_check CHECK (progress >= 0),
+        CONSTRAINT new_fk FOREIGN KEY (goal_id)
+            REFERENCES goals_goal (id) DEFERRABLE INITIALLY DEFERRED
+    """
+
+
+def partition_progress_log(apps, schema_editor):
+    """
+    Only the table changes: the model keeps ``id`` as its primary key and
+    Django's state is left as 0011 built it (see goals.partitions).
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    execute = schema_editor.execute
+    names = _names(schema_editor)
+
+    # Writers wait for the swap instead of inserting into a table being dropped
+    execute(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE")
+    execute(f"CREATE SEQUENCE {SEQUENCE}")
+    execute(
+        f"CREATE TABLE {TABLE}_new (id bigint NOT NULL DEFAULT nextval('{SEQUENCE}'), "
+        f"{_columns('id, created_at')}) PARTITION BY RANGE (created_at)"
+    )
+
+    # One partition per month of existing history, up to a few months ahead
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT min(created_at), now() FROM {TABLE}")
+        oldest, now = cursor.fetchone()
+    first = _month_index(oldest or now)
+    for index in range(first, _month_index(now) + MONTHS_AHEAD + 1):
+        start, end = _month(index), _month(index + 1)
+        execute(
+            f"CREATE TABLE {TABLE}_p{start:%Y%m} PARTITION OF {TABLE}_new "
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+    execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE}_new DEFAULT")
+
+    _swap_in(schema_editor, names)
+    execute(f"SELECT setval('{SEQUENCE}', COALESCE(max(id), 0) + 1, false) FROM {TABLE}")
+    execute(f"ALTER SEQUENCE {SEQUENCE} OWNED BY {TABLE}.id")
+
+
+def unpartition_progress_log(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    execute = schema_editor.execute
+    names = _names(schema_editor)
+
+    execute(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE")
+    execute(
+        f"CREATE TABLE {TABLE}_new (id bigint GENERATED BY DEFAULT AS IDENTITY, "
+        f"{_columns('id')})"
+    )
+    _swap_in(schema_editor, names)  # Dropping the parent drops the partitions and sequence
+    execute(f"ALTER SEQUENCE {TABLE}_new_id_seq RENAME TO {TABLE}_id_seq")
+    execute(
+        f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), "
+        f"COALESCE(max(id), 0) + 1, false) FROM {TABLE}"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0020_progress_rollups'),
+    ]
+
+    operations = [
+        # Database only: the model and its state are unchanged
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(partition_progress_log, unpartition_progress_log),
+            ],
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-17 19:29
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0021_partition_progress_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usergoalstats',
+            name='changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-17 19:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0022_user_stats_changed_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('total_users', models.PositiveIntegerField(default=0)),
+                ('new_users', models.PositiveIntegerField(default=0)),
+                ('active_users', models.PositiveIntegerField(default=0)),
+                ('weekly_active_users', models.PositiveIntegerField(default=0)),
+                ('progress_updates', models.PositiveIntegerField(default=0)),
+                ('total_goals', models.PositiveIntegerField(default=0)),
+                ('not_started_goals', models.PositiveIntegerField(default=0)),
+                ('in_progress_goals', models.PositiveIntegerField(default=0)),
+                ('completed_goals', models.PositiveIntegerField(default=0)),
+                ('categories', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count, Max, Q
+
+COUNTER_FIELDS = [
+    "total_goals",
+    "not_started_goals",
+    "in_progress_goals",
+    "completed_goals",
+    "max_progress",
+]
+STREAK_FIELDS = ["current_streak", "longest_streak", "last_active_on"]
+
+
+def _streaks(days):
+    """(current, longest, last day) for a sorted list of active days."""
+    current = longest = 0
+    previous = None
+    for day in days:
+        current = current + 1 if previous and (day - previous).days == 1 else 1
+        longest = max(longest, current)
+        previous = day
+    return current, longest, previous
+
+
+def backfill_user_stats(apps, schema_editor):
+    """
+    Build the stats rows of users who existed before 0012.
+
+    Until now they were only built lazily by get_user_stats, so anything
+    reading the tables directly (the staff user list, analytics snapshots)
+    saw those users as having no goals. Mirrors goals.stats.rebuild_user_stats
+    on the historical models, 500 users at a time.
+    """
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    Goal = apps.get_model("goals", "Goal")
+    UserGoalStats = apps.get_model("goals", "UserGoalStats")
+    UserCategoryStats = apps.get_model("goals", "UserCategoryStats")
+    UserActivityDay = apps.get_model("goals", "UserActivityDay")
+
+    last_id = 0
+    while True:
+        chunk = list(
+            User.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:500]
+        )
+        if not chunk:
+            break
+        goals = Goal.objects.filter(user_id__in=chunk).order_by()
+
+        # Users without goals still get a (zeroed) row
+        rows = {user_id: UserGoalStats(user_id=user_id) for user_id in chunk}
+        per_user = goals.values("user_id").annotate(
+            total_goals=Count("id"),
+            not_started_goals=Count("id", filter=Q(status="Not Started")),
+            in_progress_goals=Count("id", filter=Q(status="In Progress")),
+            completed_goals=Count("id", filter=Q(status="Completed")),
+            max_progress=Max("progress"),
+        )
+        for row in per_user:
+            for field in COUNTER_FIELDS:
+                setattr(rows[row["user_id"]], field, row[field])
+
+        active_days = {}
+        activity = UserActivityDay.objects.filter(user_id__in=chunk)
+        for user_id, day in activity.order_by("user_id", "day").values_list("user_id", "day"):
+            active_days.setdefault(user_id, []).append(day)
+        for user_id, days in active_days.items():
+            row = rows[user_id]
+            row.current_streak, row.longest_streak, row.last_active_on = _streaks(days)
+
+        UserGoalStats.objects.bulk_create(
+            rows.values(),
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=COUNTER_FIELDS + STREAK_FIELDS,
+        )
+        UserCategoryStats.objects.filter(user_id__in=chunk).delete()
+        UserCategoryStats.objects.bulk_create(
+            [
+                UserCategoryStats(**row)
+                for row in goals.values("user_id", "category").annotate(total=Count("id"))
+            ],
+            batch_size=1000,
+        )
+        last_id = chunk[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0023_analytics_snapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_user_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-17 19:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0024_backfill_user_goal_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MilestoneProvisionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_user_id', models.PositiveBigIntegerField(default=0)),
+                ('enqueued_at', models.DateTimeField(auto_now_add=True)),
+                ('milestone', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='provision_job', to='goals.milestone')),
+            ],
+        ),
+    ]
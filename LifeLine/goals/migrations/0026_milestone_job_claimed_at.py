@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 20:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0025_milestone_provision_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='milestonejob',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,284 @@
+"""
+Milestone rules: the one place that decides what a user has unlocked.
+
+``evaluate_goal_change`` handles a single Goal save incrementally and
+``evaluate_users`` re-checks whole users in batches; both share the
+same index and unlock path.
+
+A single Goal save can only move a few counters: the user's total goals,
+their completed goals, the goal's category count and the goal's own
+progress. Instead of re-checking the whole Milestone catalog on every
+save, we look at how each counter moved and only pick the milestones
+whose ``required_value`` lies inside that (old, new] window.
+
+Milestone definitions rarely change, so they are held in an in-process
+``MilestoneIndex``: thresholds grouped by (milestone_type, category) and
+sorted, so each window is two bisects and no query. Categories are
+matched case-insensitively, as the original progress check did.
+"""
+
+import threading
+import time
+from bisect import bisect_right
+
+from django.contrib.auth.models import User
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .models import Goal, Milestone, UserMilestone
+from .pagination import id_chunks
+from .stats import bump_generation, milestone_counters
+
+
+def _category_key(category):
+    return category.casefold() if category else None
+
+
+class MilestoneIndex:
+    """
+    Sorted thresholds per (milestone_type, category).
+
+    The index is rebuilt lazily after ``invalidate()``, which the Milestone
+    signals call. Other worker processes do not see those signals, so the
+    index also reloads itself every ``ttl`` seconds as a safety net.
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._buckets = None
+        self._loaded_at = 0.0
+
+    def invalidate(self):
+        with self._lock:
+            self._buckets = None
+
+    def _load(self):
+        buckets = {}
+        for m in Milestone.objects.order_by("required_value", "id"):
+            thresholds, milestones = buckets.setdefault(
+                (m.milestone_type, _category_key(m.category)), ([], [])
+            )
+            thresholds.append(m.required_value)
+            milestones.append(m)
+        return buckets
+
+    def buckets(self):
+        with self._lock:
+            if self._buckets is None or time.monotonic() - self._loaded_at > self.ttl:
+                self._buckets = self._load()
+                self._loaded_at = time.monotonic()
+            return self._buckets
+
+    def crossed(self, milestone_type, category, low, high):
+        """Milestones with ``low < required_value <= high`` (``low`` None = unbounded)."""
+        bucket = self.buckets().get((milestone_type, _category_key(category)))
+        if bucket is None:
+            return []
+        thresholds, milestones = bucket
+        start = 0 if low is None else bisect_right(thresholds, low)
+        end = bisect_right(thresholds, high)
+        return milestones[start:end]
+
+
+milestone_index = MilestoneIndex()
+
+
+# -------------------------------
+# PROVISIONING
+# -------------------------------
+def provision_user_milestones(user_ids, milestone_ids=None):
+    """
+    Create the locked UserMilestone rows for ``user_ids`` in one insert.
+
+    Rows that already exist are left untouched, so this is safe to re-run.
+    """
+    if milestone_ids is None:
+        milestone_ids = list(Milestone.objects.values_list("id", flat=True))
+    UserMilestone.objects.bulk_create(
+        [
+            UserMilestone(user_id=user_id, milestone_id=milestone_id)
+            for user_id in user_ids
+            for milestone_id in milestone_ids
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+def backfill_milestones(milestone_ids=None, chunk_size=500):
+    """
+    Provision rows for every user, ``chunk_size`` users per insert.
+
+    Used when milestones are added after users registered. Returns the
+    number of users processed.
+    """
+    if milestone_ids is None:
+        milestone_ids = list(Milestone.objects.values_list("id", flat=True))
+    processed = 0
+    for chunk in id_chunks(User.objects.all(), chunk_size):
+        provision_user_milestones(chunk, milestone_ids)
+        processed += len(chunk)
+    return processed
+
+
+def evaluate_goal_change(user_id, old, new, created=False, counters=None):
+    """
+    Unlock every milestone crossed by a goal moving from ``old`` to ``new``.
+
+    ``old`` and ``new`` are ``Goal.tracked_state()`` dicts. ``old`` is
+    ignored for a freshly created goal; otherwise None means the previous
+    state is unknown and each counter is checked against its full range.
+    ``counters`` are the ``milestone_counters`` written by this save (see
+    ``goals.stats.record_goal_saved``); they are read back if missing.
+    Returns the newly unlocked milestones.
+    """
+    unknown = old is None and not created
+    was_completed = old is not None and old["status"] == "Completed"
+    became_completed = new["status"] == "Completed" and not was_completed
+    category_moved = created or (old is not None and old["category"] != new["category"])
+
+    candidates = []
+
+    # -------------------------------
+    # COUNTER MILESTONES
+    # -------------------------------
+    if created or unknown or became_completed or category_moved:
+        counts = counters or milestone_counters(user_id, new["category"])
+
+        if created or unknown:
+            low = None if unknown else counts["total"] - 1
+            candidates += milestone_index.crossed("total_goals", None, low, counts["total"])
+
+        if became_completed or unknown:
+            low = None if unknown else counts["completed"] - 1
+            candidates += milestone_index.crossed(
+                "completed_goals", None, low, counts["completed"]
+            )
+
+        if category_moved or unknown:
+            low = None if unknown else counts["in_category"] - 1
+            candidates += milestone_index.crossed(
+                "category", new["category"], low, counts["in_category"]
+            )
+
+    # -------------------------------
+    # PROGRESS MILESTONES
+    # -------------------------------
+    if unknown:
+        old_progress = None
+    else:
+        old_progress = 0 if created else old["progress"]
+
+    if old_progress is None or new["progress"] > old_progress:
+        # Uncategorised progress milestones apply to every goal
+        for category in (None, new["category"]):
+            candidates += milestone_index.crossed(
+                "progress", category, old_progress, new["progress"]
+            )
+
+    return _unlock({user_id: {m.id: m for m in candidates}}).get(user_id, [])
+
+
+def evaluate_users(user_ids):
+    """
+    Re-evaluate every milestone for ``user_ids`` from their current goals.
+
+    Used when there is no old state to diff against (queued jobs, backfills).
+    The whole batch costs one grouped aggregate plus the unlock writes.
+    Returns {user_id: [newly unlocked milestones]}.
+    """
+    per_category = (
+        Goal.objects.filter(user_id__in=user_ids)
+        .order_by()
+        .values("user_id", "category")
+        .annotate(
+            total=Count("id"),
+            completed=Count("id", filter=Q(status="Completed")),
+            top_progress=Max("progress"),
+        )
+    )
+
+    counters = {}
+    for row in per_category:
+        c = counters.setdefault(
+            row["user_id"], {"total": 0, "completed": 0, "progress": 0, "categories": {}}
+        )
+        c["total"] += row["total"]
+        c["completed"] += row["completed"]
+        c["progress"] = max(c["progress"], row["top_progress"])
+        c["categories"][row["category"]] = (row["total"], row["top_progress"])
+
+    reached = {}
+    for user_id, c in counters.items():
+        candidates = milestone_index.crossed("total_goals", None, None, c["total"])
+        candidates += milestone_index.crossed("completed_goals", None, None, c["completed"])
+        candidates += milestone_index.crossed("progress", None, None, c["progress"])
+        for category, (total, top_progress) in c["categories"].items():
+            candidates += milestone_index.crossed("category", category, None, total)
+            candidates += milestone_index.crossed("progress", category, None, top_progress)
+        reached[user_id] = {m.id: m for m in candidates}
+
+    return _unlock(reached)
+
+
+def _unlock(reached):
+    """
+    Unlock the reached milestones that are still locked.
+
+    ``reached`` maps user_id -> {milestone_id: Milestone}. Rows are
+    normally provisioned up front, so this is one read of the candidate
+    rows plus an UPDATE per 1000 rows. A row that is missing (a milestone
+    whose provisioning job has not run yet) is inserted already unlocked,
+    so an unlock never depends on the worker.
+    Returns {user_id: [newly unlocked milestones]}.
+    """
+    reached = {user_id: ms for user_id, ms in reached.items() if ms}
+    if not reached:
+        return {}
+
+    candidates = UserMilestone.objects.filter(
+        user_id__in=list(reached),
+        milestone_id__in=set().union(*reached.values()),
+    )
+    to_unlock = []
+    unlocked = {}
+    missing = {user_id: dict(ms) for user_id, ms in reached.items()}
+    for row_id, user_id, milestone_id, is_unlocked in candidates.values_list(
+        "id", "user_id", "milestone_id", "unlocked"
+    ):
+        milestone = missing[user_id].pop(milestone_id, None)
+        if milestone is not None and not is_unlocked:
+            to_unlock.append(row_id)
+            unlocked.setdefault(user_id, []).append(milestone)
+
+    # Every unlock gets the same values, so a plain UPDATE per batch of ids
+    # does what bulk_update would without a CASE per row
+    now = timezone.now()
+    for start in range(0, len(to_unlock), 1000):
+        UserMilestone.objects.filter(
+            id__in=to_unlock[start:start + 1000], unlocked=False
+        ).update(unlocked=True, unlocked_at=now)
+
+    new_rows = [
+        UserMilestone(user_id=user_id, milestone_id=milestone_id, unlocked=True, unlocked_at=now)
+        for user_id, ms in missing.items()
+        for milestone_id in ms
+    ]
+    if new_rows:
+        # Upsert: the provisioning job may insert the locked row meanwhile
+        UserMilestone.objects.bulk_create(
+            new_rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["user", "milestone"],
+            update_fields=["unlocked", "unlocked_at"],
+        )
+        for user_id, ms in missing.items():
+            if ms:
+                unlocked.setdefault(user_id, []).extend(ms.values())
+
+    if unlocked:
+        # After the unlock, so a fragment cached in between is not kept
+        bump_generation(list(unlocked))
+    return unlocked
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 class Goal(models.Model):
     STATUS_CHOICES = [
@@ -35,6 +36,31 @@ class Goal(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     target_date = models.DateField(null=True, blank=True)
 
+    # Fields milestone rules depend on
+    TRACKED_FIELDS = ("progress", "status", "category")
+
+    class Meta:
+        # Every view scopes goals to one user before filtering or sorting.
+        # The sort indexes end in id to match keyset pagination's tiebreaker.
+        indexes = [
+            models.Index(fields=["user", "status"], name="goal_user_status_idx"),
+            models.Index(fields=["user", "category"], name="goal_user_category_idx"),
+            models.Index(fields=["user", "-created_at", "-id"], name="goal_user_created_idx"),
+            models.Index(fields=["user", "progress", "id"], name="goal_user_progress_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what was loaded so signals can tell what a save changed
+        loaded = dict(zip(field_names, values))
+        if all(f in loaded for f in cls.TRACKED_FIELDS):
+            instance._loaded_state = {f: loaded[f] for f in cls.TRACKED_FIELDS}
+        return instance
+
+    def tracked_state(self):
+        return {f: getattr(self, f) for f in self.TRACKED_FIELDS}
+
     def save(self, *args, **kwargs):
         # Auto-update status based on progress
         if self.progress >= 100:
@@ -90,6 +116,180 @@ class UserMilestone(models.Model):
 
 
 class GoalProgressLog(models.Model):
+    # Partitioned by created_at month on Postgres; see goals.partitions
     goal = models.ForeignKey(Goal, on_delete=models.CASCADE)
     progress = models.PositiveIntegerField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the update happened, not when the buffered row is written
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["goal", "created_at"], name="progresslog_goal_created_idx"),
+        ]
+
+
+class UserGoalStats(models.Model):
+    """Per-user goal counters, kept in step with every Goal write."""
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="goal_stats"
+    )
+    total_goals = models.PositiveIntegerField(default=0)
+    not_started_goals = models.PositiveIntegerField(default=0)
+    in_progress_goals = models.PositiveIntegerField(default=0)
+    completed_goals = models.PositiveIntegerField(default=0)
+    max_progress = models.PositiveIntegerField(default=0)
+
+    # Activity streak, recomputed from UserActivityDay on each active day
+    current_streak = models.PositiveIntegerField(default=0)
+    longest_streak = models.PositiveIntegerField(default=0)
+    last_active_on = models.DateField(null=True, blank=True)
+
+    # Bumped by every Goal and UserMilestone write; cached page fragments
+    # are keyed on it, so a write is all it takes to invalidate them
+    generation = models.PositiveBigIntegerField(default=0)
+    # When generation last moved; the Last-Modified of the user's JSON views
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    # Status value -> counter column
+    STATUS_FIELDS = {
+        "Not Started": "not_started_goals",
+        "In Progress": "in_progress_goals",
+        "Completed": "completed_goals",
+    }
+
+    def __str__(self):
+        return f"Goal stats for {self.user_id}"
+
+    def streak_as_of(self, today):
+        """The current streak, or 0 if the user missed a day since."""
+        if self.last_active_on and (today - self.last_active_on).days <= 1:
+            return self.current_streak
+        return 0
+
+
+class UserCategoryStats(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="category_stats")
+    category = models.CharField(max_length=100)
+    total = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("user", "category")
+
+    def __str__(self):
+        return f"{self.category} stats for {self.user_id}"
+
+
+class UserActivityDay(models.Model):
+    """One row per day on which the user logged progress."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="activity_days")
+    day = models.DateField()
+    updates = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("user", "day")
+
+    def __str__(self):
+        return f"{self.user_id} active on {self.day}"
+
+
+class MilestoneJob(models.Model):
+    """A pending "re-evaluate this user's milestones" request."""
+    # One pending job per user: enqueuing again only moves enqueued_at
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="milestone_job")
+    enqueued_at = models.DateTimeField(auto_now_add=True)
+    # Set while a worker evaluates the job; stale claims are retried
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Milestone job for {self.user_id}"
+
+
+class MilestoneProvisionJob(models.Model):
+    """A new milestone whose locked UserMilestone rows are still being created."""
+    milestone = models.OneToOneField(
+        Milestone, on_delete=models.CASCADE, related_name="provision_job"
+    )
+    # Users up to this id already have their row
+    last_user_id = models.PositiveBigIntegerField(default=0)
+    enqueued_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Provision milestone {self.milestone_id} after user {self.last_user_id}"
+
+
+class Watermark(models.Model):
+    """How far an incremental job has processed, by job name."""
+    name = models.CharField(max_length=100, unique=True)
+    # None until the job first runs
+    value = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.value}"
+
+
+class ProgressRollup(models.Model):
+    """GoalProgressLog totals for one user over one period."""
+    updates = models.PositiveIntegerField(default=0)
+    # Summed so later rows can be folded in; see average_progress
+    progress_total = models.PositiveBigIntegerField(default=0)
+    max_progress = models.PositiveIntegerField(default=0)
+    # Updates that took a goal to 100%
+    completions = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def average_progress(self):
+        return round(self.progress_total / self.updates, 1) if self.updates else 0
+
+
+class ProgressDayRollup(ProgressRollup):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="progress_days")
+    day = models.DateField()
+
+    class Meta:
+        unique_together = ("user", "day")
+
+    def __str__(self):
+        return f"{self.user_id} progress on {self.day}"
+
+
+class ProgressWeekRollup(ProgressRollup):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="progress_weeks")
+    # Monday of the ISO week
+    week = models.DateField()
+
+    class Meta:
+        unique_together = ("user", "week")
+
+    def __str__(self):
+        return f"{self.user_id} progress in week of {self.week}"
+
+
+class AnalyticsSnapshot(models.Model):
+    """Platform-wide totals for one day, written by ``manage.py snapshot_analytics``."""
+    day = models.DateField(unique=True)
+    total_users = models.PositiveIntegerField(default=0)
+    new_users = models.PositiveIntegerField(default=0)
+    # Users who logged progress on the day / in the 7 days up to it
+    active_users = models.PositiveIntegerField(default=0)
+    weekly_active_users = models.PositiveIntegerField(default=0)
+    progress_updates = models.PositiveIntegerField(default=0)
+    total_goals = models.PositiveIntegerField(default=0)
+    not_started_goals = models.PositiveIntegerField(default=0)
+    in_progress_goals = models.PositiveIntegerField(default=0)
+    completed_goals = models.PositiveIntegerField(default=0)
+    # {category: goal count}
+    categories = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Analytics for {self.day}"
+
+    @property
+    def completion_rate(self):
+        if not self.total_goals:
+            return 0
+        return round(self.completed_goals / self.total_goals * 100)
@@ -0,0 +1,119 @@
+"""
+Keyset (cursor) pagination for goal lists.
+
+Every sort mode orders by its field plus ``id`` as a tiebreaker, and the
+cursor carries the last row's (value, id). The next page is a range scan
+from there, so page N costs the same as page 1 however deep the user
+scrolls.
+
+Sort modes map to (field, descending, parse), where ``parse`` turns the
+cursor's JSON value back into a field value. ``SORTS`` holds the goal list
+modes; other lists pass their own table.
+
+``id_chunks`` is the same idea for batch jobs walking a whole table.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+
+DEFAULT_SORT = "date_desc"
+
+# sort mode -> (field, descending, parse)
+SORTS = {
+    "date_asc": ("created_at", False, datetime.fromisoformat),
+    "date_desc": ("created_at", True, datetime.fromisoformat),
+    "progress_asc": ("progress", False, int),
+    "progress_desc": ("progress", True, int),
+    # Only for querysets annotated by goals.search.search_goals
+    "relevance": ("search_rank", True, float),
+}
+
+# For lists that are never searched
+PLAIN_SORTS = {mode: sort for mode, sort in SORTS.items() if mode != "relevance"}
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def _encode(value, pk):
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, pk]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(cursor, parse):
+    """(value, id) from a cursor, or None if it is missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, pk = json.loads(raw)
+        return parse(value), int(pk)
+    except (ValueError, TypeError):
+        return None
+
+
+def keyset_queryset(queryset, sort, cursor=None, sorts=SORTS, default=DEFAULT_SORT):
+    """
+    ``queryset`` ordered for ``sort`` and narrowed to rows after ``cursor``.
+
+    Unknown sort modes fall back to ``default`` and a bad cursor starts
+    from the beginning. Returns the queryset and the sort field.
+    """
+    field, descending, parse = sorts.get(sort) or sorts[default]
+    prefix = "-" if descending else ""
+    queryset = queryset.order_by(f"{prefix}{field}", f"{prefix}id")
+
+    position = _decode(cursor, parse)
+    if position is not None:
+        value, pk = position
+        after = "lt" if descending else "gt"
+        queryset = queryset.filter(
+            Q(**{f"{field}__{after}": value}) | Q(**{field: value, f"id__{after}": pk})
+        )
+    return queryset, field
+
+
+def keyset_page(queryset, sort, cursor=None, page_size=24, sorts=SORTS, default=DEFAULT_SORT):
+    """One page of ``queryset`` in ``sort`` order, starting after ``cursor``."""
+    queryset, field = keyset_queryset(queryset, sort, cursor, sorts, default)
+
+    # One extra row tells us whether there is a next page
+    items = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        last = items[-1]
+        next_cursor = _encode(getattr(last, field), last.pk)
+    return KeysetPage(items, next_cursor)
+
+
+def id_chunks(queryset, chunk_size):
+    """
+    The primary keys of ``queryset`` in order, ``chunk_size`` at a time.
+
+    Each chunk is a range scan from the previous one's last id, so batch
+    jobs walk a large table without OFFSET or a long-held cursor.
+    """
+    last_id = 0
+    while True:
+        chunk = list(
+            queryset.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:chunk_size]
+        )
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]
@@ -0,0 +1,131 @@
+"""
+Monthly range partitions for GoalProgressLog on Postgres.
+
+Migration 0021 turns ``goals_goalprogresslog`` into a table partitioned
+by ``created_at`` month, one ``goals_goalprogresslog_pYYYYMM`` partition
+per month plus a default partition for rows outside them. The primary
+key becomes (id, created_at), as Postgres requires the partition key in
+every unique constraint; ids still come from a single sequence, so the
+model keeps ``id`` as its primary key.
+
+Queries with a ``created_at`` range only scan the matching partitions,
+and dropping a month of history is a DETACH + DROP instead of a DELETE.
+``manage.py progress_log_partitions`` creates months ahead of time and
+drops expired ones. On other databases the table stays a plain table and
+everything here is a no-op.
+"""
+
+import re
+from datetime import date, datetime, time
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import GoalProgressLog, Watermark
+from .rollups import WATERMARK as ROLLUP_WATERMARK
+
+PARENT = GoalProgressLog._meta.db_table
+PARTITION_NAME = re.compile(rf"^{PARENT}_p(\d{{4}})(\d{{2}})$")
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(month, n):
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{PARENT}_p{month:%Y%m}"
+
+
+def is_partitioned(using="default"):
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass", [PARENT]
+        )
+        return cursor.fetchone() is not None
+
+
+def partitions(using="default"):
+    """{month: partition table name} for the existing monthly partitions."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = %s::regclass
+            """,
+            [PARENT],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    months = {}
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            months[date(int(match[1]), int(match[2]), 1)] = name
+    return months
+
+
+def create_partitions(months_ahead=3, using="default"):
+    """
+    Make sure partitions exist from this month to ``months_ahead`` months on.
+
+    Returns the names of the partitions created.
+    """
+    if not is_partitioned(using):
+        return []
+    existing = partitions(using)
+    this_month = month_start(timezone.localdate())
+    created = []
+    with connections[using].cursor() as cursor:
+        for n in range(months_ahead + 1):
+            month = add_months(this_month, n)
+            if month in existing:
+                continue
+            # Fails if the default partition already holds rows for this
+            # month; running the command ahead of time avoids that
+            cursor.execute(
+                f"CREATE TABLE {partition_name(month)} PARTITION OF {PARENT} "
+                f"FOR VALUES FROM (%s) TO (%s)",
+                [_bound(month), _bound(add_months(month, 1))],
+            )
+            created.append(partition_name(month))
+    return created
+
+
+def drop_partitions_before(month, using="default"):
+    """
+    Drop every monthly partition that ends on or before ``month``.
+
+    Months the rollups have not fully processed are kept, so the rollups
+    always count a row before it is dropped. Returns the names dropped.
+    """
+    if not is_partitioned(using):
+        return []
+    rolled_up = (
+        Watermark.objects.using(using).filter(name=ROLLUP_WATERMARK)
+        .values_list("value", flat=True).first()
+    )
+    if rolled_up is None:
+        return []
+
+    dropped = []
+    for start, name in sorted(partitions(using).items()):
+        end = add_months(start, 1)
+        if end > month or _bound(end) > rolled_up:
+            break
+        with transaction.atomic(using=using), connections[using].cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {PARENT} DETACH PARTITION {name}")
+            cursor.execute(f"DROP TABLE {name}")
+        dropped.append(name)
+    return dropped
+
+
+def _bound(month):
+    return timezone.make_aware(datetime.combine(month, time.min))
@@ -0,0 +1,96 @@
+"""
+Write-behind recording of GoalProgressLog entries.
+
+``record_progress`` appends to an in-process buffer instead of inserting
+a row during the request. The buffer is written with one ``bulk_create``
+when it holds ``PROGRESS_LOG_BUFFER_SIZE`` entries, when the oldest entry
+is ``PROGRESS_LOG_FLUSH_INTERVAL`` seconds old, and when the worker
+process exits.
+
+Entries still buffered when a process is killed outright are lost; that
+is the trade-off for keeping the INSERT off the request path. Set
+``PROGRESS_LOG_SYNC`` to write every entry immediately. Tests that go
+through ``update_progress`` must set it too, or the flush timer writes
+after the test has ended.
+"""
+
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+from .models import Goal, GoalProgressLog
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressLogBuffer:
+    def __init__(self, max_size=200, max_age=5.0):
+        self.max_size = max_size
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries = []
+        self._timer = None
+
+    def add(self, goal_id, progress):
+        entry = GoalProgressLog(goal_id=goal_id, progress=progress, created_at=timezone.now())
+        with self._lock:
+            self._entries.append(entry)
+            full = len(self._entries) >= self.max_size
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.max_age, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write every buffered entry. Returns the number of rows written."""
+        with self._lock:
+            entries, self._entries = self._entries, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not entries:
+            return 0
+
+        # Goals deleted since their entries were buffered would fail the FK
+        live = set(
+            Goal.objects.filter(id__in={e.goal_id for e in entries})
+            .values_list("id", flat=True)
+        )
+        entries = [e for e in entries if e.goal_id in live]
+        try:
+            GoalProgressLog.objects.bulk_create(entries, batch_size=1000)
+        except DatabaseError:
+            logger.exception("Dropped %d progress log entries", len(entries))
+            return 0
+        return len(entries)
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread opened its own connection; don't leak it
+            connections.close_all()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+progress_log_buffer = ProgressLogBuffer(
+    max_size=getattr(settings, "PROGRESS_LOG_BUFFER_SIZE", 200),
+    max_age=getattr(settings, "PROGRESS_LOG_FLUSH_INTERVAL", 5.0),
+)
+atexit.register(progress_log_buffer.flush)
+
+
+def record_progress(goal):
+    """Log ``goal``'s current progress, buffered unless PROGRESS_LOG_SYNC is on."""
+    if getattr(settings, "PROGRESS_LOG_SYNC", False):
+        GoalProgressLog.objects.create(goal=goal, progress=goal.progress)
+    else:
+        progress_log_buffer.add(goal.id, goal.progress)
@@ -0,0 +1,193 @@
+"""
+Datasets for the reports page.
+
+Each chart's data is built by one function here. ``/reports/summary/``
+returns all of them in a single response; the per-chart endpoints are
+kept for older clients and return the same data.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, DateField, F, Window
+from django.db.models.functions import Trunc
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .downsample import lttb
+from .models import Goal, ProgressDayRollup, ProgressWeekRollup, UserGoalStats
+from .stats import category_totals, get_user_stats
+
+TIMELINE_GRANULARITIES = ("day", "week", "month")
+MAX_TIMELINE_POINTS = 2000
+TIMELINE_CACHE_SECONDS = 60 * 60
+
+ACTIVITY_PERIODS = {
+    # period -> (rollup model, date field, how far back)
+    "day": (ProgressDayRollup, "day", timedelta(days=30)),
+    "week": (ProgressWeekRollup, "week", timedelta(weeks=12)),
+}
+
+
+def _day_start(value):
+    """Aware midnight for a ?from/?to date string, or None if it isn't one."""
+    try:
+        day = parse_date(value or "")
+    except ValueError:
+        day = None
+    if day is None:
+        return None
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _granularity(params):
+    granularity = params.get("granularity", "day")
+    return granularity if granularity in TIMELINE_GRANULARITIES else "day"
+
+
+def _points(params):
+    """The requested ?points, or None for the full series."""
+    try:
+        points = int(params.get("points", ""))
+    except ValueError:
+        return None
+    return min(points, MAX_TIMELINE_POINTS) if points >= 3 else None
+
+
+def _timeline(user_id, granularity, start, end):
+    """
+    (buckets, cumulative goal counts) per day, week or month.
+
+    One row per bucket comes back from the database, so the series grows
+    with the date range, not with the number of goals.
+    """
+    goals = Goal.objects.filter(user_id=user_id)
+    if end is not None:
+        goals = goals.filter(created_at__lt=end + timedelta(days=1))
+
+    # Goals created before the range still count towards the running total
+    baseline = 0
+    if start is not None:
+        baseline = goals.filter(created_at__lt=start).count()
+        goals = goals.filter(created_at__gte=start)
+
+    # COUNT() OVER (ORDER BY bucket) counts every goal up to and including
+    # the row's bucket; DISTINCT then leaves one row per bucket
+    series = (
+        goals.annotate(bucket=Trunc("created_at", granularity, output_field=DateField()))
+        .annotate(total=Window(Count("id"), order_by=F("bucket").asc()))
+        .values_list("bucket", "total")
+        .distinct()
+        .order_by("bucket")
+    )
+    buckets = []
+    values = []
+    for bucket, total in series:
+        buckets.append(bucket)
+        values.append(baseline + total)
+    return buckets, values
+
+
+def timeline_data(user_id, params, generation=None):
+    """
+    The cumulative goal timeline.
+
+    ``granularity`` is day, week or month; ``from`` and ``to`` (YYYY-MM-DD,
+    inclusive) narrow the range. With ``points`` the series is downsampled
+    with LTTB to that many points and cached per user, data generation,
+    range and point count, so only the first load after a write pays for it.
+    Pass ``generation`` when the caller has already read it.
+    """
+    granularity = _granularity(params)
+    start = _day_start(params.get("from"))
+    end = _day_start(params.get("to"))
+    points = _points(params)
+
+    key = None
+    if points is not None:
+        if generation is None:
+            generation = (
+                UserGoalStats.objects.filter(user_id=user_id)
+                .values_list("generation", flat=True).first()
+            )
+        key = f"timeline:{user_id}:{generation}:{granularity}:{start}:{end}:{points}"
+        data = cache.get(key)
+        if data is not None:
+            return data
+
+    buckets, values = _timeline(user_id, granularity, start, end)
+    if points is not None:
+        kept = lttb([bucket.toordinal() for bucket in buckets], values, points)
+        buckets = [buckets[i] for i in kept]
+        values = [values[i] for i in kept]
+
+    data = {
+        "granularity": granularity,
+        "labels": [bucket.strftime("%Y-%m-%d") for bucket in buckets],
+        "values": values,
+    }
+    if key is not None:
+        cache.set(key, data, TIMELINE_CACHE_SECONDS)
+    return data
+
+
+def status_data(goal_stats):
+    return [
+        {"status": status, "total": getattr(goal_stats, field)}
+        for status, field in goal_stats.STATUS_FIELDS.items()
+        if getattr(goal_stats, field)
+    ]
+
+
+def category_data(user_id):
+    return [
+        {"category": category, "total": total}
+        for category, total in category_totals(user_id).items()
+    ]
+
+
+def completions_data(goal_stats):
+    completed = goal_stats.completed_goals
+    return {
+        "completed": completed,
+        "pending": goal_stats.total_goals - completed,
+    }
+
+
+def activity_data(user_id, params):
+    """Progress updates per day or ISO week, from the rollups (see goals.rollups)."""
+    period = params.get("period", "week")
+    if period not in ACTIVITY_PERIODS:
+        period = "week"
+    model, field, span = ACTIVITY_PERIODS[period]
+
+    rows = model.objects.filter(
+        user_id=user_id,
+        **{f"{field}__gte": timezone.localdate() - span},
+    ).order_by(field)
+
+    data = {"period": period, "labels": [], "updates": [], "average": [], "max": [], "completions": []}
+    for row in rows:
+        data["labels"].append(getattr(row, field).strftime("%Y-%m-%d"))
+        data["updates"].append(row.updates)
+        data["average"].append(row.average_progress)
+        data["max"].append(row.max_progress)
+        data["completions"].append(row.completions)
+    return data
+
+
+def report_summary(user_id, params):
+    """
+    Every chart's dataset at once.
+
+    The status and completion charts share one stats-row read; the
+    categories, timeline and activity charts add one indexed query each.
+    """
+    goal_stats = get_user_stats(user_id)
+    return {
+        "timeline": timeline_data(user_id, params, goal_stats.generation),
+        "status": status_data(goal_stats),
+        "categories": category_data(user_id),
+        "completions": completions_data(goal_stats),
+        "activity": activity_data(user_id, params),
+    }
@@ -0,0 +1,127 @@
+"""
+Daily and weekly rollups of the goal progress history.
+
+``rollup_progress`` folds GoalProgressLog rows into ProgressDayRollup and
+ProgressWeekRollup, so report charts read a handful of rollup rows
+instead of aggregating the raw log. It is incremental: a Watermark
+records the ``created_at`` it has processed up to, and each run only
+aggregates the rows after it.
+
+The log holds one row per actual progress change (``update_progress``
+skips saves that leave the value as it was), so ``updates`` counts the
+same events as UserActivityDay and a row at 100 is a transition to
+100, i.e. one completion. UserActivityDay is the source of truth for
+daily activity (streaks, analytics snapshots); these rollups are the
+source for the report charts only and trail it by ``lag``.
+
+Progress entries are buffered before they are written (see
+``goals.progress_log``), so a row can land a few seconds after its
+``created_at``. Each run therefore stops ``lag`` short of now, giving
+those late rows time to arrive before the watermark passes them.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import GoalProgressLog, ProgressDayRollup, ProgressWeekRollup, Watermark
+from .stats import bump_generation
+
+WATERMARK = "progress_rollup"
+DEFAULT_LAG = timedelta(minutes=5)
+
+ROLLUP_FIELDS = ["updates", "progress_total", "max_progress", "completions"]
+
+
+def week_of(day):
+    """Monday of ``day``'s ISO week."""
+    return day - timedelta(days=day.weekday())
+
+
+def _merge(model, period_field, totals):
+    """Add ``totals`` {(user_id, period): {field: value}} into ``model``'s rows."""
+    if not totals:
+        return
+    user_ids = {user_id for user_id, _ in totals}
+    periods = {period for _, period in totals}
+    existing = model.objects.filter(
+        user_id__in=user_ids, **{f"{period_field}__in": periods}
+    )
+    for row in existing:
+        new = totals.get((row.user_id, getattr(row, period_field)))
+        if new is None:
+            continue
+        new["updates"] += row.updates
+        new["progress_total"] += row.progress_total
+        new["max_progress"] = max(new["max_progress"], row.max_progress)
+        new["completions"] += row.completions
+
+    model.objects.bulk_create(
+        [
+            model(user_id=user_id, **{period_field: period}, **values)
+            for (user_id, period), values in totals.items()
+        ],
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["user", period_field],
+        update_fields=ROLLUP_FIELDS,
+    )
+
+
+def rollup_progress(lag=DEFAULT_LAG):
+    """
+    Fold log rows from the watermark up to ``now - lag`` into the rollups.
+
+    Runs in one transaction with the watermark row locked, so concurrent
+    runs queue up instead of counting rows twice. Returns the number of
+    log rows folded in.
+    """
+    until = timezone.now() - lag
+    with transaction.atomic():
+        mark, _ = Watermark.objects.select_for_update().get_or_create(name=WATERMARK)
+        if mark.value is not None and mark.value >= until:
+            return 0
+
+        rows = GoalProgressLog.objects.filter(created_at__lte=until)
+        if mark.value is not None:
+            rows = rows.filter(created_at__gt=mark.value)
+        per_day = (
+            rows.annotate(day=TruncDate("created_at"))
+            .order_by()
+            .values("goal__user_id", "day")
+            .annotate(
+                updates=Count("id"),
+                progress_total=Sum("progress"),
+                max_progress=Max("progress"),
+                # Rows are changes, so each one at 100 is a new completion
+                completions=Count("id", filter=Q(progress=100)),
+            )
+        )
+
+        days = {}
+        weeks = {}
+        folded = 0
+        for row in per_day:
+            user_id = row.pop("goal__user_id")
+            day = row.pop("day")
+            days[(user_id, day)] = dict(row)
+            week = weeks.setdefault(
+                (user_id, week_of(day)), dict.fromkeys(ROLLUP_FIELDS, 0)
+            )
+            week["updates"] += row["updates"]
+            week["progress_total"] += row["progress_total"]
+            week["max_progress"] = max(week["max_progress"], row["max_progress"])
+            week["completions"] += row["completions"]
+            folded += row["updates"]
+
+        _merge(ProgressDayRollup, "day", days)
+        _merge(ProgressWeekRollup, "week", weeks)
+
+        mark.value = until
+        mark.save(update_fields=["value", "updated_at"])
+        # The activity chart of these users just changed
+        bump_generation({user_id for user_id, _ in days})
+    return folded
@@ -0,0 +1,145 @@
+"""
+Indexed full-text goal search.
+
+Postgres: ``goals_goal.search_vector`` is a stored generated tsvector
+(title weighted above description) with a GIN index, added by migration
+0017. Queries use ``to_tsquery`` with prefix matching and ``ts_rank``.
+
+Both backends index unstemmed words: stemming would turn "training" into
+"train" and break prefix matches while the user is still typing.
+
+SQLite: an FTS5 external-content table, ``goals_goal_fts``, kept in step
+by triggers. SQLite drops triggers whenever Django rebuilds a table during
+a migration, so they are (re)installed after every ``migrate``.
+
+Any other backend, or a SQLite build without FTS5, falls back to
+``icontains`` matching.
+"""
+
+import re
+
+from django.db import OperationalError, connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .models import Goal
+
+GOAL_TABLE = Goal._meta.db_table
+FTS_TABLE = f"{GOAL_TABLE}_fts"
+
+_fts_available = {}
+
+
+def _terms(query):
+    return re.findall(r"\w+", query.lower())
+
+
+def _sqlite_has_fts(alias):
+    if alias not in _fts_available:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE]
+            )
+            _fts_available[alias] = cursor.fetchone() is not None
+    return _fts_available[alias]
+
+
+def search_goals(queryset, query):
+    """
+    Narrow a Goal queryset to ``query`` matches, annotated with ``search_rank``.
+
+    Every word must match, either whole or as a prefix
+    ("run mara" finds "running a marathon").
+    """
+    terms = _terms(query)
+    if not terms:
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    vendor = connections[queryset.db].vendor
+
+    if vendor == "postgresql":
+        tsquery = " & ".join(f"{t}:*" for t in terms)
+        return queryset.filter(
+            RawSQL(
+                f"{GOAL_TABLE}.search_vector @@ to_tsquery('simple', %s)",
+                [tsquery],
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f"ts_rank({GOAL_TABLE}.search_vector, to_tsquery('simple', %s))",
+                [tsquery],
+                output_field=FloatField(),
+            )
+        )
+
+    if vendor == "sqlite" and _sqlite_has_fts(queryset.db):
+        match = " ".join(f'"{t}"*' for t in terms)
+        return queryset.filter(
+            id__in=RawSQL(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]
+            )
+        ).annotate(
+            # bm25() is lower for better matches; weight title over description
+            search_rank=RawSQL(
+                f"(SELECT -bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND rowid = {GOAL_TABLE}.id)",
+                [match],
+                output_field=FloatField(),
+            )
+        )
+
+    matches = Q()
+    for term in terms:
+        matches &= Q(title__icontains=term) | Q(description__icontains=term)
+    return queryset.filter(matches).annotate(
+        search_rank=Value(0.0, output_field=FloatField())
+    )
+
+
+# -------------------------------
+# SQLITE FTS5 SHADOW TABLE
+# -------------------------------
+SQLITE_FTS_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description,
+        content='{GOAL_TABLE}', content_rowid='id',
+        tokenize='unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {GOAL_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {GOAL_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description
+        ON {GOAL_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+    # Cheap for a dev database, and resyncs rows written while the
+    # triggers were missing
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+
+def install_sqlite_fts(using="default", **kwargs):
+    """post_migrate hook: create the FTS5 table and its triggers if missing."""
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    if GOAL_TABLE not in connection.introspection.table_names():
+        return  # Goals not migrated yet (e.g. migrating another app)
+
+    try:
+        with connection.cursor() as cursor:
+            for sql in SQLITE_FTS_SQL:
+                cursor.execute(sql)
+    except OperationalError:
+        # SQLite built without FTS5: search falls back to icontains
+        pass
+    _fts_available.pop(using, None)
@@ -1,52 +1,75 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from django.utils import timezone
-from .models import Goal, Milestone, UserMilestone
+from .models import Goal, Milestone
+from .jobs import (
+    enqueue_milestone_evaluation, enqueue_milestone_provisioning, milestones_deferred,
+)
+from .milestones import evaluate_goal_change, milestone_index
+from .stats import record_activity, record_goal_deleted, record_goal_saved
 
 
+# Receivers run in definition order: stats must be current before
+# check_milestones reads its counters from them.
 @receiver(post_save, sender=Goal)
-def check_milestones(sender, instance, **kwargs):
-    user = instance.user
-
-    # Total and completed goals
-    total_goals = Goal.objects.filter(user=user).count()
-    completed_goals = Goal.objects.filter(user=user, status="Completed").count()
-
-    # All goals for progress checking
-    user_goals = Goal.objects.filter(user=user)
-
-    for milestone in Milestone.objects.all():
-        # Get or create UserMilestone
-        user_m, _ = UserMilestone.objects.get_or_create(user=user, milestone=milestone)
-        if user_m.unlocked:
-            continue  # Skip already unlocked
-
-        achieved = False
-
-        if milestone.milestone_type == "total_goals":
-            achieved = total_goals >= milestone.required_value
-
-        elif milestone.milestone_type == "completed_goals":
-            achieved = completed_goals >= milestone.required_value
-
-        elif milestone.milestone_type == "progress":
-            # Unlock if any goal has progress >= required_value
-            achieved = user_goals.filter(progress__gte=milestone.required_value).exists()
-
-        # elif milestone.milestone_type == "category" and milestone.category:
-        #     # Count only goals in that category that are started or completed
-        #     count_in_category = user_goals.filter(
-        #         category=milestone.category,
-        #         progress__gt=0  # Only consider goals with some progress
-        #     ).count()
-        #     achieved = count_in_category >= milestone.required_value
-
-        elif milestone.milestone_type == "category" and milestone.category:
-            # Count goals in that category
-            count_in_category = Goal.objects.filter(user=user, category=milestone.category).count()
-            achieved = count_in_category >= milestone.required_value
-
-        if achieved:
-            user_m.unlocked = True
-            user_m.unlocked_at = timezone.now()
-            user_m.save()
+def update_goal_stats(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_state = getattr(instance, "_loaded_state", None)
+    new_state = instance.tracked_state()
+    # check_milestones windows on these, not on a later read another
+    # save may already have moved
+    instance._milestone_counters = record_goal_saved(
+        instance.user_id, old_state, new_state, created
+    )
+
+    if old_state is not None and not created and old_state["progress"] != new_state["progress"]:
+        record_activity(instance.user_id)
+
+
+@receiver(post_save, sender=Goal)
+def check_milestones(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return  # Fixture loading, nothing to evaluate
+
+    new_state = instance.tracked_state()
+    old_state = getattr(instance, "_loaded_state", None)
+
+    # Views read this back to announce unlocks without querying again
+    instance.unlocked_milestones = []
+
+    if milestones_deferred():
+        # Left to the milestone_worker command, off the request path
+        user_id = instance.user_id
+        transaction.on_commit(lambda: enqueue_milestone_evaluation([user_id]))
+    else:
+        # Only milestones crossed between the old and new state are considered
+        instance.unlocked_milestones = evaluate_goal_change(
+            instance.user_id, old_state, new_state, created=created,
+            counters=getattr(instance, "_milestone_counters", None),
+        )
+
+    # A second save of the same instance starts from what was just written
+    instance._loaded_state = new_state
+
+
+@receiver(post_delete, sender=Goal)
+def remove_goal_stats(sender, instance, **kwargs):
+    old_state = getattr(instance, "_loaded_state", None) or instance.tracked_state()
+    record_goal_deleted(instance.user_id, old_state)
+
+
+@receiver(post_save, sender=Milestone)
+@receiver(post_delete, sender=Milestone)
+def refresh_milestone_index(sender, **kwargs):
+    # Rebuild from committed data, not from a transaction that may roll back
+    transaction.on_commit(milestone_index.invalidate)
+
+
+@receiver(post_save, sender=Milestone)
+def provision_new_milestone(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        # Existing users need a (locked) row for it too; milestone_worker
+        # creates them in chunks instead of holding up the admin save
+        milestone_id = instance.id
+        transaction.on_commit(lambda: enqueue_milestone_provisioning([milestone_id]))
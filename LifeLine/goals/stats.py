@@ -0,0 +1,390 @@
+"""
+Materialized per-user goal statistics.
+
+UserGoalStats and UserCategoryStats are adjusted with F() expressions from
+the Goal signals, so reads are a primary-key lookup instead of a fresh
+COUNT over the goals table. ``rebuild_user_stats`` recomputes them from
+scratch and is what the ``rebuild_goal_stats`` command runs.
+
+Progress updates are also rolled up per day in UserActivityDay; the
+activity streak derived from it is kept on the stats row.
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    Case, Count, Exists, F, IntegerField, Max, OuterRef, Q, Subquery, Value, When, Window,
+)
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import Goal, UserActivityDay, UserCategoryStats, UserGoalStats, UserMilestone
+
+COUNTER_FIELDS = [
+    "total_goals",
+    "not_started_goals",
+    "in_progress_goals",
+    "completed_goals",
+    "max_progress",
+]
+
+STREAK_FIELDS = ["current_streak", "longest_streak", "last_active_on"]
+
+
+def _recomputed_max_progress():
+    """Subquery expression for the user's current highest goal progress."""
+    highest = (
+        Goal.objects.filter(user_id=OuterRef("user_id"))
+        .order_by()
+        .values("user_id")
+        .annotate(m=Max("progress"))
+        .values("m")
+    )
+    return Coalesce(Subquery(highest, output_field=IntegerField()), Value(0))
+
+
+def _streaks(days):
+    """(current, longest, last day) for a sorted list of active days."""
+    current = longest = 0
+    previous = None
+    for day in days:
+        current = current + 1 if previous and (day - previous).days == 1 else 1
+        longest = max(longest, current)
+        previous = day
+    return current, longest, previous
+
+
+def rebuild_user_stats(user_ids=None):
+    """
+    Recompute stats rows from the goals table.
+
+    Rebuilds every user when ``user_ids`` is None. Returns the number of
+    stats rows written.
+    """
+    goals = Goal.objects.all()
+    stats = UserGoalStats.objects.all()
+    categories = UserCategoryStats.objects.all()
+    activity = UserActivityDay.objects.all()
+    if user_ids is not None:
+        goals = goals.filter(user_id__in=user_ids)
+        stats = stats.filter(user_id__in=user_ids)
+        categories = categories.filter(user_id__in=user_ids)
+        activity = activity.filter(user_id__in=user_ids)
+
+    per_user = (
+        goals.order_by()
+        .values("user_id")
+        .annotate(
+            total_goals=Count("id"),
+            not_started_goals=Count("id", filter=Q(status="Not Started")),
+            in_progress_goals=Count("id", filter=Q(status="In Progress")),
+            completed_goals=Count("id", filter=Q(status="Completed")),
+            max_progress=Max("progress"),
+        )
+    )
+    per_category = (
+        goals.order_by()
+        .values("user_id", "category")
+        .annotate(total=Count("id"))
+    )
+
+    rows = {row["user_id"]: UserGoalStats(**row) for row in per_user}
+    if user_ids is not None:
+        # Users without goals still get a (zeroed) row
+        for user_id in user_ids:
+            rows.setdefault(user_id, UserGoalStats(user_id=user_id))
+
+    active_days = {}
+    for user_id, day in activity.order_by("user_id", "day").values_list("user_id", "day"):
+        active_days.setdefault(user_id, []).append(day)
+    for user_id, days in active_days.items():
+        row = rows.setdefault(user_id, UserGoalStats(user_id=user_id))
+        row.current_streak, row.longest_streak, row.last_active_on = _streaks(days)
+
+    with transaction.atomic():
+        # Users whose goals are all gone keep their row, zeroed out
+        has_goals = Goal.objects.filter(user_id=OuterRef("user_id"))
+        stats.exclude(Exists(has_goals)).update(**{f: 0 for f in COUNTER_FIELDS})
+        UserGoalStats.objects.bulk_create(
+            rows.values(),
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=COUNTER_FIELDS + STREAK_FIELDS,
+        )
+        categories.delete()
+        UserCategoryStats.objects.bulk_create(
+            [UserCategoryStats(**row) for row in per_category],
+            batch_size=1000,
+        )
+        # Rebuilt numbers may differ from what cached pages showed
+        bump_generation(list(rows))
+
+    return len(rows)
+
+
+def build_missing_user_stats(chunk_size=500):
+    """
+    Build the stats rows of users who have goals but no row yet.
+
+    For readers that sum the stats tables across users. Returns the
+    number of rows built.
+    """
+    missing = list(
+        User.objects.filter(goal_stats__isnull=True)
+        .filter(Exists(Goal.objects.filter(user_id=OuterRef("pk"))))
+        .values_list("id", flat=True)
+    )
+    for start in range(0, len(missing), chunk_size):
+        rebuild_user_stats(missing[start:start + chunk_size])
+    return len(missing)
+
+
+def get_user_stats(user_id):
+    """The user's stats row, built on first access."""
+    stats = UserGoalStats.objects.filter(user_id=user_id).first()
+    if stats is None:
+        rebuild_user_stats([user_id])
+        stats = UserGoalStats.objects.get(user_id=user_id)
+    return stats
+
+
+def category_totals(user_id):
+    """{category: goal count} for the categories the user has goals in."""
+    return dict(
+        UserCategoryStats.objects.filter(user_id=user_id, total__gt=0)
+        .values_list("category", "total")
+    )
+
+
+def milestone_counters(user_id, category):
+    """Total, completed and per-category counts in one primary-key lookup."""
+    in_category = UserCategoryStats.objects.filter(
+        user_id=OuterRef("user_id"), category=category
+    ).values("total")
+    counters = (
+        UserGoalStats.objects.filter(user_id=user_id)
+        .annotate(in_category=Coalesce(Subquery(in_category), Value(0)))
+        .values("total_goals", "completed_goals", "in_category")
+        .first()
+    )
+    if counters is None:
+        get_user_stats(user_id)
+        return milestone_counters(user_id, category)
+    return {
+        "total": counters["total_goals"],
+        "completed": counters["completed_goals"],
+        "in_category": counters["in_category"],
+    }
+
+
+def achievement_counts(user_id):
+    """Unlocked milestones, overall and this week, in one conditional aggregate."""
+    week_ago = timezone.now() - timedelta(days=7)
+    return UserMilestone.objects.filter(user_id=user_id).aggregate(
+        achievements=Count("id", filter=Q(unlocked=True)),
+        achievements_this_week=Count(
+            "id", filter=Q(unlocked=True, unlocked_at__gte=week_ago)
+        ),
+    )
+
+
+def recent_achievements(user_id, limit=3):
+    """
+    The latest unlocks, each carrying the user's achievement counts.
+
+    The counts are window aggregates over every unlocked row, computed
+    before the LIMIT, so the dashboard gets them without a second query.
+    """
+    week_ago = timezone.now() - timedelta(days=7)
+    return list(
+        UserMilestone.objects.filter(user_id=user_id, unlocked=True)
+        .select_related("milestone")
+        .annotate(
+            achievements=Window(Count("id")),
+            achievements_this_week=Window(Count("id", filter=Q(unlocked_at__gte=week_ago))),
+        )
+        .order_by("-unlocked_at")[:limit]
+    )
+
+
+def bump_generation(user_ids):
+    """Invalidate cached fragments for writes that bypass the Goal signals."""
+    UserGoalStats.objects.filter(user_id__in=user_ids).update(
+        generation=F("generation") + 1, changed_at=timezone.now()
+    )
+
+
+def dashboard_stats(user_id, goal_stats=None, recent=None):
+    """
+    Everything the dashboard's stat cards show.
+
+    Pass ``recent_achievements()`` as ``recent`` to take the achievement
+    counts from it instead of querying them.
+    """
+    if goal_stats is None:
+        goal_stats = get_user_stats(user_id)
+    total = goal_stats.total_goals
+    completed = goal_stats.completed_goals
+
+    stats = {
+        "total_goals": total,
+        "completed_goals": completed,
+        "in_progress_goals": goal_stats.in_progress_goals,
+        "not_started_goals": goal_stats.not_started_goals,
+        "completion_rate": round((completed / total) * 100) if total > 0 else 0,
+        "streak": goal_stats.streak_as_of(timezone.localdate()),
+        "longest_streak": goal_stats.longest_streak,
+    }
+    if recent is None:
+        stats.update(achievement_counts(user_id))
+    elif recent:
+        stats["achievements"] = recent[0].achievements
+        stats["achievements_this_week"] = recent[0].achievements_this_week
+    else:
+        stats.update(achievements=0, achievements_this_week=0)
+    return stats
+
+
+# -------------------------------
+# WRITE PATH
+# -------------------------------
+def _apply(user_id, deltas, category_deltas, max_progress=None, counters_for=None):
+    """
+    Add ``deltas`` to the user's counters in a single UPDATE per table,
+    bumping the data generation along the way.
+
+    With ``counters_for`` (a category), returns ``milestone_counters`` as
+    of this write: they are read in the same transaction, while the
+    UPDATE still holds the row lock, so a concurrent save cannot slip in
+    between. Otherwise returns {}. Returns None when a row to update is
+    missing, so the caller can fall back to a rebuild.
+    """
+    updates = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if max_progress is not None:
+        updates["max_progress"] = max_progress
+    # Any Goal write may change what the user's pages show
+    updates["generation"] = F("generation") + 1
+    updates["changed_at"] = timezone.now()
+
+    with transaction.atomic():
+        if not UserGoalStats.objects.filter(user_id=user_id).update(**updates):
+            return None
+        for category, delta in category_deltas.items():
+            if not delta:
+                continue
+            touched = UserCategoryStats.objects.filter(
+                user_id=user_id, category=category
+            ).update(total=F("total") + delta)
+            if not touched:
+                if delta < 0:
+                    return None
+                try:
+                    with transaction.atomic():
+                        UserCategoryStats.objects.create(
+                            user_id=user_id, category=category, total=delta
+                        )
+                except IntegrityError:
+                    # A concurrent first save in this category created the row
+                    UserCategoryStats.objects.filter(
+                        user_id=user_id, category=category
+                    ).update(total=F("total") + delta)
+        if counters_for is None:
+            return {}
+        return milestone_counters(user_id, counters_for)
+
+
+def record_goal_saved(user_id, old, new, created):
+    """
+    Fold one Goal save into the stats. ``old`` is None if unknown.
+
+    Returns the milestone counters right after this save when the save
+    moved one of them, else None (also after a rebuild).
+    """
+    if not created and old is None:
+        rebuild_user_stats([user_id])
+        return None
+
+    status_field = UserGoalStats.STATUS_FIELDS
+    deltas = {}
+    category_deltas = {}
+    max_progress = None
+
+    if created:
+        deltas["total_goals"] = 1
+        deltas[status_field[new["status"]]] = 1
+        category_deltas[new["category"]] = 1
+        max_progress = Greatest(F("max_progress"), Value(new["progress"]))
+    else:
+        if old["status"] != new["status"]:
+            deltas[status_field[old["status"]]] = -1
+            deltas[status_field[new["status"]]] = 1
+        if old["category"] != new["category"]:
+            category_deltas[old["category"]] = -1
+            category_deltas[new["category"]] = 1
+        if new["progress"] > old["progress"]:
+            max_progress = Greatest(F("max_progress"), Value(new["progress"]))
+        elif new["progress"] < old["progress"]:
+            max_progress = _recomputed_max_progress()
+
+    moved = created or new["category"] != old["category"] or (
+        new["status"] == "Completed" and old["status"] != "Completed"
+    )
+    counters = _apply(
+        user_id, deltas, category_deltas, max_progress,
+        counters_for=new["category"] if moved else None,
+    )
+    if counters is None:
+        rebuild_user_stats([user_id])
+    return counters or None
+
+
+def record_goal_deleted(user_id, old):
+    """
+    Remove a deleted goal from the stats.
+
+    A missing row is left alone: it is either rebuilt on next access or
+    is being deleted together with the user.
+    """
+    _apply(
+        user_id,
+        {"total_goals": -1, UserGoalStats.STATUS_FIELDS[old["status"]]: -1},
+        {old["category"]: -1},
+        _recomputed_max_progress(),
+    )
+
+
+def record_activity(user_id):
+    """
+    Count a progress update towards today's activity and the streak.
+
+    Only the first update of a day touches the streak columns, which are
+    derived from the previous active day in O(1).
+    """
+    today = timezone.localdate()
+    with transaction.atomic():
+        if UserActivityDay.objects.filter(user_id=user_id, day=today).update(
+            updates=F("updates") + 1
+        ):
+            return  # Already active today, the streak is unchanged
+        try:
+            with transaction.atomic():
+                UserActivityDay.objects.create(user_id=user_id, day=today, updates=1)
+        except IntegrityError:
+            # A concurrent request created today's row first
+            UserActivityDay.objects.filter(user_id=user_id, day=today).update(
+                updates=F("updates") + 1
+            )
+            return
+
+        streak = Case(
+            When(last_active_on=today - timedelta(days=1), then=F("current_streak") + 1),
+            default=Value(1),
+        )
+        UserGoalStats.objects.filter(user_id=user_id).exclude(last_active_on=today).update(
+            current_streak=streak,
+            longest_streak=Greatest(F("longest_streak"), streak),
+            last_active_on=today,
+        )
@@ -1,3 +1,1196 @@
-from django.test import TestCase
+import csv
+from concurrent.futures import Executor, Future
+import json
+import re
+from datetime import date, datetime, timedelta
+from importlib import import_module
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections
+from django.db.migrations.loader import MigrationLoader
+from django.db.models import Count, Max, Sum
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import http_date
+from django.utils import timezone
+
+from .analytics import snapshot_analytics
+from .compaction import compact_progress_log
+from .downsample import lttb
+from .jobs import (
+    CLAIM_TIMEOUT, enqueue_milestone_evaluation, run_milestone_jobs, run_provision_jobs,
+)
+from .milestones import evaluate_goal_change, milestone_index, provision_user_milestones
+from .models import (
+    AnalyticsSnapshot, Goal, GoalProgressLog, Milestone, MilestoneJob, MilestoneProvisionJob,
+    ProgressDayRollup, ProgressWeekRollup, UserActivityDay, UserCategoryStats, UserGoalStats,
+    UserMilestone,
+)
+from .pagination import SORTS, keyset_page, keyset_queryset
+from .partitions import (
+    add_months, create_partitions, drop_partitions_before, is_partitioned, partition_name,
+)
+from .progress_log import ProgressLogBuffer
+from .rollups import rollup_progress, week_of
+from .search import search_goals
+from .stats import get_user_stats, rebuild_user_stats, record_activity, record_goal_saved
+from .views import filtered_goals
+
+
+# -------------------------------
+# MILESTONES
+# -------------------------------
+class MilestoneTestCase(TestCase):
+    """Runs against its own milestone catalog instead of the seeded one."""
+    MILESTONES = [
+        ("total_goals", None, 1),
+        ("total_goals", None, 2),
+        ("total_goals", None, 5),
+        ("completed_goals", None, 1),
+        ("progress", None, 50),
+        ("progress", None, 100),
+        ("category", "Learning", 1),
+    ]
+
+    def setUp(self):
+        Milestone.objects.all().delete()
+        for milestone_type, category, required in self.MILESTONES:
+            Milestone.objects.create(
+                title=f"{milestone_type} {category or 'any'} {required}",
+                description="Test milestone",
+                milestone_type=milestone_type,
+                category=category,
+                required_value=required,
+            )
+        # The signals invalidate on commit, which a TestCase never reaches
+        milestone_index.invalidate()
+        self.addCleanup(milestone_index.invalidate)
+        self.user = User.objects.create_user("miles", "miles@example.com", "pw")
+
+    def unlocked(self, user=None):
+        return set(
+            UserMilestone.objects.filter(user=user or self.user, unlocked=True)
+            .values_list("milestone__title", flat=True)
+        )
+
+
+class MilestoneEvaluationTests(MilestoneTestCase):
+    def test_crossing_one_threshold(self):
+        goal = Goal.objects.create(user=self.user, title="One", category="Career")
+
+        self.assertEqual([m.title for m in goal.unlocked_milestones], ["total_goals any 1"])
+        self.assertEqual(self.unlocked(), {"total_goals any 1"})
+
+    def test_crossing_several_thresholds_in_one_save(self):
+        goal = Goal.objects.create(user=self.user, title="One", category="Career")
+        goal.progress = 100
+        goal.save()
+
+        self.assertEqual(
+            {m.title for m in goal.unlocked_milestones},
+            {"completed_goals any 1", "progress any 50", "progress any 100"},
+        )
+        self.assertEqual(
+            [m.required_value for m in milestone_index.crossed("total_goals", None, 1, 5)], [2, 5]
+        )
+
+    def test_interleaved_saves_each_window_on_their_own_counts(self):
+        four = Milestone.objects.create(
+            title="total_goals any 4", description="", milestone_type="total_goals",
+            required_value=4,
+        )
+        UserMilestone.objects.create(user=self.user, milestone=four)
+        milestone_index.invalidate()
+        for i in range(3):
+            Goal.objects.create(user=self.user, title=f"Goal {i}", category="Career")
+
+        # Both saves update the stats before either evaluates its milestones
+        state = {"progress": 0, "status": "Not Started", "category": "Career"}
+        fourth = record_goal_saved(self.user.id, None, state, created=True)
+        fifth = record_goal_saved(self.user.id, None, state, created=True)
+        self.assertEqual((fourth["total"], fifth["total"]), (4, 5))
+
+        unlocked = evaluate_goal_change(self.user.id, None, state, created=True, counters=fourth)
+        unlocked += evaluate_goal_change(self.user.id, None, state, created=True, counters=fifth)
+        self.assertEqual(
+            sorted(m.required_value for m in unlocked if m.milestone_type == "total_goals"), [4, 5]
+        )
+
+    def test_progress_going_down_unlocks_nothing(self):
+        goal = Goal.objects.create(user=self.user, title="One", category="Career", progress=80)
+        late = Milestone.objects.create(
+            title="late", description="Added later", milestone_type="progress", required_value=60
+        )
+        UserMilestone.objects.create(user=self.user, milestone=late)
+        milestone_index.invalidate()
+
+        goal.progress = 60
+        goal.save()
+        self.assertEqual(goal.unlocked_milestones, [])
+        self.assertNotIn("late", self.unlocked())
+
+    def test_category_change(self):
+        goal = Goal.objects.create(user=self.user, title="Course", category="Career")
+        self.assertNotIn("category Learning 1", self.unlocked())
+
+        goal.category = "Learning"
+        goal.save()
+        self.assertEqual([m.title for m in goal.unlocked_milestones], ["category Learning 1"])
+
+    def test_unknown_previous_state_checks_every_threshold(self):
+        # bulk_create skips the signals; a partial load has no tracked state
+        Goal.objects.bulk_create([
+            Goal(user=self.user, title="Done", category="Learning", progress=100, status="Completed"),
+            Goal(user=self.user, title="Half", category="Career", progress=50, status="In Progress"),
+        ])
+        goal = Goal.objects.only("id", "user", "title").get(title="Half")
+        goal.title = "Half way"
+        goal.save()
+
+        # Counters are checked over their full range; progress and category
+        # only for the saved goal (the other one is evaluate_users' job)
+        self.assertEqual(self.unlocked(), {
+            "total_goals any 1", "total_goals any 2", "completed_goals any 1", "progress any 50",
+        })
+
+
+class MilestoneIndexTests(MilestoneTestCase):
+    def test_milestone_writes_refresh_the_index_on_commit(self):
+        self.assertEqual(milestone_index.crossed("total_goals", None, 2, 3), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            milestone = Milestone.objects.create(
+                title="Three", description="", milestone_type="total_goals", required_value=3
+            )
+        self.assertEqual(milestone_index.crossed("total_goals", None, 2, 3), [milestone])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            milestone.required_value = 4
+            milestone.save()
+        self.assertEqual(milestone_index.crossed("total_goals", None, 2, 3), [])
+        self.assertEqual(milestone_index.crossed("total_goals", None, 3, 4), [milestone])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            milestone.delete()
+        self.assertEqual(milestone_index.crossed("total_goals", None, 3, 4), [])
+
+
+class MilestoneProvisioningTests(MilestoneTestCase):
+    def test_new_users_get_a_locked_row_per_milestone(self):
+        rows = UserMilestone.objects.filter(user=self.user)
+        self.assertEqual(rows.count(), len(self.MILESTONES))
+        self.assertFalse(rows.filter(unlocked=True).exists())
+
+    def test_unlocks_do_not_wait_for_provisioning(self):
+        for i in range(3):
+            Goal.objects.create(user=self.user, title=f"Goal {i}", category="Career")
+        four = Milestone.objects.create(
+            title="Four", description="", milestone_type="total_goals", required_value=4
+        )
+        milestone_index.invalidate()
+
+        goal = Goal.objects.create(user=self.user, title="Goal 4", category="Career")
+        self.assertEqual(goal.unlocked_milestones, [four])
+        self.assertTrue(UserMilestone.objects.get(user=self.user, milestone=four).unlocked)
+
+        # Provisioning afterwards leaves the unlock alone
+        provision_user_milestones([self.user.id], [four.id])
+        self.assertIn("Four", self.unlocked())
+
+    def test_new_milestones_are_provisioned_by_the_worker_in_chunks(self):
+        others = [User.objects.create_user(f"user{i}", f"user{i}@example.com", "pw") for i in range(4)]
+        with self.captureOnCommitCallbacks(execute=True):
+            milestone = Milestone.objects.create(
+                title="New", description="", milestone_type="total_goals", required_value=9
+            )
+        # The admin save only queues the work
+        self.assertFalse(UserMilestone.objects.filter(milestone=milestone).exists())
+
+        self.assertEqual(run_provision_jobs(chunk_size=3), 3)
+        job = MilestoneProvisionJob.objects.get()
+        self.assertEqual(job.last_user_id, others[1].id)
+
+        call_command("milestone_worker", once=True, chunk_size=3, stdout=StringIO())
+        self.assertFalse(MilestoneProvisionJob.objects.exists())
+        self.assertEqual(
+            UserMilestone.objects.filter(milestone=milestone).count(), User.objects.count()
+        )
+
+
+@override_settings(MILESTONES_DEFERRED=True)
+class DeferredMilestoneTests(MilestoneTestCase):
+    def test_saves_queue_one_job_per_user_for_the_worker(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            goal = Goal.objects.create(user=self.user, title="One", category="Career")
+        first = MilestoneJob.objects.get(user=self.user).enqueued_at
+        self.assertEqual(goal.unlocked_milestones, [])
+        self.assertEqual(self.unlocked(), set())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            goal.progress = 100
+            goal.save()
+        # Coalesced into the waiting job, which moves to the latest save
+        self.assertGreater(MilestoneJob.objects.get(user=self.user).enqueued_at, first)
+
+        self.assertEqual(run_milestone_jobs(), 1)
+        self.assertFalse(MilestoneJob.objects.exists())
+        self.assertEqual(self.unlocked(), {
+            "total_goals any 1", "completed_goals any 1", "progress any 50", "progress any 100",
+        })
+
+    def test_claimed_jobs_are_skipped_until_the_claim_goes_stale(self):
+        enqueue_milestone_evaluation([self.user.id])
+
+        def crash(user_ids):
+            # Another worker finds nothing to claim meanwhile
+            self.assertEqual(run_milestone_jobs(), 0)
+            raise RuntimeError("worker died")
+
+        with mock.patch("goals.jobs.evaluate_users", side_effect=crash):
+            with self.assertRaises(RuntimeError):
+                run_milestone_jobs()
+        self.assertIsNotNone(MilestoneJob.objects.get(user=self.user).claimed_at)
+        self.assertEqual(run_milestone_jobs(), 0)
+
+        MilestoneJob.objects.update(claimed_at=timezone.now() - CLAIM_TIMEOUT - timedelta(minutes=1))
+        self.assertEqual(run_milestone_jobs(), 1)
+        self.assertFalse(MilestoneJob.objects.exists())
+
+    def test_a_job_requeued_during_evaluation_survives_the_claim(self):
+        Goal.objects.create(user=self.user, title="One", category="Career")
+        enqueue_milestone_evaluation([self.user.id, self.user.id])
+
+        def save_meanwhile(user_ids):
+            enqueue_milestone_evaluation(user_ids)
+            return {}
+
+        with mock.patch("goals.jobs.evaluate_users", side_effect=save_meanwhile):
+            self.assertEqual(run_milestone_jobs(), 1)
+        # Kept, and released for any worker
+        job = MilestoneJob.objects.get(user=self.user)
+        self.assertIsNone(job.claimed_at)
+
+        self.assertEqual(run_milestone_jobs(), 1)
+        self.assertEqual(run_milestone_jobs(), 0)
+        self.assertEqual(self.unlocked(), {"total_goals any 1"})
+
+
+class InlineExecutor(Executor):
+    """Runs submissions right away; worker processes would not see test data."""
+
+    def __init__(self, max_workers=None, initializer=None):
+        self.max_workers = max_workers
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+class RecomputeMilestonesTests(MilestoneTestCase):
+    def test_workers_evaluate_every_chunk(self):
+        users = [self.user] + [
+            User.objects.create_user(f"user{i}", f"user{i}@example.com", "pw") for i in range(4)
+        ]
+        # Without the signals, as if the goals predated the milestones
+        Goal.objects.bulk_create([
+            Goal(user=user, title="Goal", category="Career", progress=progress, status=status)
+            for user, (progress, status) in zip(users, [(100, "Completed"), (50, "In Progress")] * 3)
+        ])
+
+        out = StringIO()
+        with mock.patch(
+            "goals.management.commands.recompute_milestones.ProcessPoolExecutor", InlineExecutor
+        ):
+            call_command("recompute_milestones", workers=2, chunk_size=2, stdout=out)
+
+        self.assertIn(f"for {User.objects.count()} user(s)", out.getvalue())
+        self.assertEqual(
+            self.unlocked(users[0]),
+            {"total_goals any 1", "completed_goals any 1", "progress any 50", "progress any 100"},
+        )
+        self.assertEqual(self.unlocked(users[1]), {"total_goals any 1", "progress any 50"})
+        # A second run finds nothing left to unlock
+        call_command("recompute_milestones", stdout=out)
+        self.assertIn("0 new unlock(s)", out.getvalue().splitlines()[-1])
+
+    def test_unlocks_a_milestone_added_after_the_fact(self):
+        Goal.objects.create(user=self.user, title="One", category="Career")
+        Goal.objects.create(user=self.user, title="Two", category="Career")
+        added = Milestone.objects.create(
+            title="Pair", description="", milestone_type="category",
+            category="Career", required_value=2,
+        )
+        milestone_index.invalidate()
+        # No provisioning job has run for it
+        self.assertFalse(UserMilestone.objects.filter(milestone=added).exists())
+
+        out = StringIO()
+        call_command("recompute_milestones", stdout=out)
+        self.assertIn("1 new unlock(s)", out.getvalue().splitlines()[-1])
+        self.assertTrue(UserMilestone.objects.get(user=self.user, milestone=added).unlocked)
+
+
+@override_settings(PROGRESS_LOG_SYNC=True)
+class MilestoneToastTests(MilestoneTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def toasts(self, response):
+        # Messages from this request only: the redirect target consumed them
+        return [str(m) for m in response.context["messages"]]
+
+    def test_create_and_update_announce_each_unlock_once(self):
+        response = self.client.post(reverse("create_goal"), {
+            "title": "Read", "description": "Twelve books", "category": "Learning",
+        }, follow=True)
+        self.assertEqual(self.toasts(response), [
+            "Goal 'Read' created successfully!",
+            "Achievement Unlocked: total_goals any 1",
+            "Achievement Unlocked: category Learning 1",
+        ])
+
+        goal = Goal.objects.get(user=self.user)
+        url = reverse("update_progress", args=[goal.pk])
+        response = self.client.post(url, {"progress": 60}, follow=True)
+        self.assertEqual(self.toasts(response), ["Achievement Unlocked: progress any 50"])
+
+        # Already unlocked: no second toast
+        self.assertEqual(self.toasts(self.client.post(url, {"progress": 70}, follow=True)), [])
+
+    def test_categories_match_case_insensitively(self):
+        Milestone.objects.create(
+            title="Scholar", description="", milestone_type="progress",
+            category="learning", required_value=80,
+        )
+        milestone_index.invalidate()
+        goal = Goal.objects.create(user=self.user, title="Read", category="Learning")
+        UserMilestone.objects.create(user=self.user, milestone=Milestone.objects.get(title="Scholar"))
+
+        response = self.client.post(
+            reverse("update_progress", args=[goal.pk]), {"progress": 90}, follow=True
+        )
+        self.assertIn("Achievement Unlocked: Scholar", self.toasts(response))
+
+
+# -------------------------------
+# GOAL STATS
+# -------------------------------
+class UserStatsBackfillTests(TestCase):
+    def test_migration_builds_rows_for_existing_users(self):
+        user = User.objects.create_user("old", "old@example.com", "pw")
+        idle = User.objects.create_user("idle", "idle@example.com", "pw")
+        Goal.objects.create(user=user, title="Done", category="Career", progress=100)
+        Goal.objects.create(user=user, title="Next", category="Career")
+        # As if both users predated the stats tables
+        UserGoalStats.objects.all().delete()
+        UserCategoryStats.objects.all().delete()
+
+        UserActivityDay.objects.create(user=user, day=date(2026, 3, 1), updates=1)
+        UserActivityDay.objects.create(user=user, day=date(2026, 3, 2), updates=3)
+
+        migration = ("goals", "0024_backfill_user_goal_stats")
+        historical = MigrationLoader(connection).project_state(migration).apps
+        import_module("goals.migrations." + migration[1]).backfill_user_stats(historical, None)
+
+        stats = UserGoalStats.objects.get(user=user)
+        self.assertEqual((stats.total_goals, stats.completed_goals), (2, 1))
+        self.assertEqual((stats.current_streak, stats.last_active_on), (2, date(2026, 3, 2)))
+        self.assertEqual(UserGoalStats.objects.get(user=idle).total_goals, 0)
+        self.assertEqual(
+            list(UserCategoryStats.objects.values_list("category", "total")), [("Career", 2)]
+        )
+
+
+class ActivityStreakTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("streak", "streak@example.com", "pw")
+        get_user_stats(self.user.id)
+        self.monday = date(2026, 3, 2)
+
+    def active(self, days_later):
+        today = self.monday + timedelta(days=days_later)
+        with mock.patch("django.utils.timezone.localdate", return_value=today):
+            record_activity(self.user.id)
+        return UserGoalStats.objects.get(user=self.user)
+
+    def test_consecutive_days_extend_and_a_gap_resets(self):
+        self.assertEqual(self.active(0).current_streak, 1)
+        self.assertEqual(self.active(1).current_streak, 2)
+        stats = self.active(2)
+        self.assertEqual((stats.current_streak, stats.longest_streak), (3, 3))
+
+        stats = self.active(5)
+        self.assertEqual((stats.current_streak, stats.longest_streak), (1, 3))
+        self.assertEqual(stats.last_active_on, self.monday + timedelta(days=5))
+
+    def test_repeat_on_the_same_day_only_counts_the_update(self):
+        self.active(0)
+        stats = self.active(0)
+        self.assertEqual(stats.current_streak, 1)
+        self.assertEqual(UserActivityDay.objects.get(user=self.user).updates, 2)
+
+    def test_stale_streak_reads_as_zero_and_matches_a_rebuild(self):
+        for day in (0, 1, 3, 4):
+            stats = self.active(day)
+        self.assertEqual(stats.streak_as_of(self.monday + timedelta(days=4)), 2)
+        self.assertEqual(stats.streak_as_of(self.monday + timedelta(days=5)), 2)
+        self.assertEqual(stats.streak_as_of(self.monday + timedelta(days=6)), 0)
+
+        rebuild_user_stats([self.user.id])
+        rebuilt = UserGoalStats.objects.get(user=self.user)
+        self.assertEqual(
+            (rebuilt.current_streak, rebuilt.longest_streak, rebuilt.last_active_on),
+            (stats.current_streak, stats.longest_streak, stats.last_active_on),
+        )
+
+
+class DashboardQueryCountTests(TestCase):
+    # Session and user lookups done by the auth middleware
+    AUTH_QUERIES = 2
+    # Stats row, recent goals, recent achievements with their counts
+    MAX_DASHBOARD_QUERIES = 3
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("dash", "dash@example.com", "pw")
+        self.client.force_login(self.user)
+
+    def dashboard_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("dashboard"))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries) - self.AUTH_QUERIES
+
+    def test_query_count_is_bounded(self):
+        for i in range(3):
+            Goal.objects.create(user=self.user, title=f"Goal {i}", category="Learning")
+        self.client.get(reverse("dashboard"))  # Stats row already exists
+
+        self.assertLessEqual(self.dashboard_queries(), self.MAX_DASHBOARD_QUERIES)
+
+    def test_achievement_counts_come_with_the_recent_achievements(self):
+        now = timezone.now()
+        rows = UserMilestone.objects.filter(user=self.user).order_by("id")[:4]
+        for days_ago, row in zip((1, 2, 3, 20), rows):
+            UserMilestone.objects.filter(pk=row.pk).update(
+                unlocked=True, unlocked_at=now - timedelta(days=days_ago)
+            )
+
+        response = self.client.get(reverse("dashboard"))
+        stats = response.context["stats"]
+        self.assertEqual((stats["achievements"], stats["achievements_this_week"]), (4, 3))
+        self.assertEqual(len(response.context["recent_achievements"]), 3)
+
+        UserMilestone.objects.filter(user=self.user).update(unlocked=False)
+        cache.clear()
+        stats = self.client.get(reverse("dashboard")).context["stats"]
+        self.assertEqual((stats["achievements"], stats["achievements_this_week"]), (0, 0))
+
+    def test_query_count_does_not_grow_with_goals(self):
+        Goal.objects.create(user=self.user, title="First", category="Career")
+        few = self.dashboard_queries()
+
+        for i in range(25):
+            goal = Goal.objects.create(user=self.user, title=f"Goal {i}", category="Career")
+            goal.progress = 100
+            goal.save()
+        self.assertEqual(self.dashboard_queries(), few)
+
+    def test_cached_fragments_until_next_write(self):
+        goal = Goal.objects.create(user=self.user, title="First", category="Career")
+        self.client.get(reverse("dashboard"))
+
+        # Only the stats row is read to find the current generation
+        self.assertEqual(self.dashboard_queries(), 1)
+
+        goal.progress = 50
+        goal.save()
+        self.assertGreater(self.dashboard_queries(), 1)
+
+
+# -------------------------------
+# KEYSET PAGINATION
+# -------------------------------
+class GoalPaginationTests(TestCase):
+    ORDERED_SORTS = ["date_asc", "date_desc", "progress_asc", "progress_desc"]
+
+    def setUp(self):
+        self.user = User.objects.create_user("pages", "pages@example.com", "pw")
+        for i in range(30):
+            Goal.objects.create(
+                user=self.user, title=f"Goal {i:02}", category="Career",
+                progress=(0, 30, 30, 100)[i % 4],
+            )
+        # Ties on created_at as well as on progress
+        Goal.objects.filter(title__lt="Goal 10").update(created_at=timezone.now())
+
+    def walk(self, sort, page_size=4):
+        goals = []
+        cursor = None
+        while True:
+            page = keyset_page(Goal.objects.filter(user=self.user), sort, cursor, page_size)
+            goals += page.items
+            if not page.has_next:
+                return goals
+            cursor = page.next_cursor
+
+    def test_every_sort_visits_each_goal_once_in_order(self):
+        for sort in self.ORDERED_SORTS:
+            with self.subTest(sort):
+                field, descending, _ = SORTS[sort]
+                goals = self.walk(sort)
+                self.assertEqual(len(goals), 30)
+                self.assertEqual(len({g.id for g in goals}), 30)
+                keys = [(getattr(g, field), g.id) for g in goals]
+                self.assertEqual(keys, sorted(keys, reverse=descending))
+
+    def load_more(self, params):
+        data = self.client.get(reverse("goals_page_more"), params).json()
+        return re.findall(r"Goal \d\d", data["html"]), data["next_cursor"]
+
+    def test_load_more_endpoint_follows_the_cursor(self):
+        self.client.force_login(self.user)
+        params = {"sort": "progress_desc", "cursor": ""}
+        titles = []
+        while True:
+            page, params["cursor"] = self.load_more(params)
+            titles += page
+            if not params["cursor"]:
+                break
+        self.assertEqual(len(titles), 30)
+        self.assertEqual(len(set(titles)), 30)
+        self.assertEqual(titles, [g.title for g in self.walk("progress_desc")])
+
+    def test_malformed_cursor_starts_over(self):
+        self.client.force_login(self.user)
+        first, _ = self.load_more({"sort": "date_asc"})
+        for cursor in ("!!!", "bm90IGpzb24", "WyJ4IiwgMV0"):
+            with self.subTest(cursor):
+                self.assertEqual(self.load_more({"sort": "date_asc", "cursor": cursor})[0], first)
+
+
+# -------------------------------
+# GOAL SEARCH
+# -------------------------------
+class GoalSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("search", "search@example.com", "pw")
+        self.marathon = Goal.objects.create(
+            user=self.user, title="Running a marathon", description="Spring race",
+            category="Health & Fitness",
+        )
+        Goal.objects.create(user=self.user, title="Learn Spanish", description="Run through Duolingo")
+        other = User.objects.create_user("other", "other@example.com", "pw")
+        Goal.objects.create(user=other, title="Marathon training", description="")
+
+    def titles(self, query):
+        return [g.title for g in search_goals(Goal.objects.filter(user=self.user), query)]
+
+    def test_every_word_matches_whole_or_as_a_prefix(self):
+        self.assertEqual(self.titles("run mara"), ["Running a marathon"])
+        self.assertEqual(sorted(self.titles("run")), ["Learn Spanish", "Running a marathon"])
+        self.assertEqual(self.titles("spring"), ["Running a marathon"])
+        self.assertEqual(self.titles("marathons"), [])
+
+    def test_title_matches_rank_above_description_matches(self):
+        ranked = list(
+            search_goals(Goal.objects.filter(user=self.user), "run").order_by("-search_rank")
+        )
+        self.assertEqual(ranked[0], self.marathon)
+
+    def test_relevance_without_a_search_falls_back_to_the_default_sort(self):
+        admin = User.objects.create_user("boss", "boss@example.com", "pw", is_staff=True)
+        self.client.force_login(admin)
+        Goal.objects.create(user=admin, title="Own goal")
+        urls = [
+            reverse("goals_page"),
+            reverse("goals_page_more"),
+            reverse("admin_user_goals", args=[self.user.id]),
+            reverse("admin_user_goals_more", args=[self.user.id]),
+        ]
+        for url in urls:
+            with self.subTest(url):
+                self.assertEqual(self.client.get(url, {"sort": "relevance"}).status_code, 200)
+
+    def test_uses_the_index_on_this_backend(self):
+        sql = str(search_goals(Goal.objects.all(), "run").query)
+        index = {"postgresql": "search_vector", "sqlite": "goals_goal_fts"}.get(connection.vendor)
+        if index:
+            self.assertIn(index, sql)
+
+    def test_index_follows_renames_and_deletes(self):
+        self.marathon.title = "Cycling a century"
+        self.marathon.save()
+        self.assertEqual(self.titles("mara"), [])
+        self.assertEqual(self.titles("cycl"), ["Cycling a century"])
+
+        self.marathon.delete()
+        self.assertEqual(self.titles("cycl"), [])
+        self.assertEqual(self.titles("spring"), [])
+
+
+# -------------------------------
+# QUERY PLAN REGRESSION CHECK
+# -------------------------------
+SEQ_SCAN_PATTERNS = {
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+    # "SCAN <table>" with nothing after it; index and virtual-table scans
+    # are reported as "SCAN <table> USING ..." / "... VIRTUAL TABLE ..."
+    "sqlite": re.compile(r"\bSCAN (\w+)$", re.MULTILINE),
+}
+
+
+def sequential_scans(queryset):
+    """Tables the database would read in full to run ``queryset``."""
+    pattern = SEQ_SCAN_PATTERNS[connections[queryset.db].vendor]
+    return pattern.findall(queryset.explain())
+
+
+@skipUnless(connection.vendor in SEQ_SCAN_PATTERNS, "No plan parser for this database")
+class GoalQueryPlanTests(TestCase):
+    USERS = 40
+    GOALS_PER_USER = 250
+
+    @classmethod
+    def setUpTestData(cls):
+        categories = [c[0] for c in Goal.CATEGORY_CHOICES]
+        users = User.objects.bulk_create(
+            [User(username=f"plan{i}", email=f"plan{i}@example.com") for i in range(cls.USERS)]
+        )
+        # bulk_create skips the Goal signals, which is all we need here
+        Goal.objects.bulk_create(
+            [
+                Goal(
+                    user=user,
+                    title=f"Goal {n}",
+                    description="Seeded for query plans",
+                    category=categories[n % len(categories)],
+                    progress=n % 101,
+                    status=("Not Started", "In Progress", "Completed")[n % 3],
+                )
+                for user in users
+                for n in range(cls.GOALS_PER_USER)
+            ],
+            batch_size=1000,
+        )
+        # A locked row per user and milestone, as provisioning leaves them
+        cls.milestone_ids = list(Milestone.objects.values_list("id", flat=True))
+        provision_user_milestones([user.id for user in users], cls.milestone_ids)
+        UserMilestone.objects.filter(milestone_id=cls.milestone_ids[0]).update(unlocked=True)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        cls.user = users[0]
+
+    def hot_querysets(self):
+        user = self.user
+        yield "dashboard recent goals", Goal.objects.filter(user=user).order_by("-created_at")[:3]
+
+        for sort in SORTS:
+            params = {"sort": sort, "search": "goal" if sort == "relevance" else ""}
+            goals, filters = filtered_goals(user, params)
+            yield f"goals_page sort={sort}", keyset_queryset(goals, filters["sort"])[0][:25]
+
+        for params in ({"status": "Completed"}, {"category": "Learning"}):
+            goals, filters = filtered_goals(user, params)
+            yield f"goals_page {params}", keyset_queryset(goals, filters["sort"])[0][:25]
+
+        page = keyset_page(Goal.objects.filter(user=user), "progress_asc", page_size=5)
+        yield "admin_user_goals next page", keyset_queryset(
+            Goal.objects.filter(user=user), "progress_asc", page.next_cursor
+        )[0][:50]
+
+        yield "stats max progress", (
+            Goal.objects.filter(user_id=user.id).order_by()
+            .values("user_id").annotate(m=Max("progress"))
+        )
+        yield "stats rebuild / evaluate_users", (
+            Goal.objects.filter(user_id__in=[user.id]).order_by()
+            .values("user_id", "category").annotate(n=Count("id"))
+        )
+        yield "milestone unlock", UserMilestone.objects.filter(
+            user_id__in=[user.id], milestone_id__in=self.milestone_ids[:3], unlocked=False
+        )
+
+    def test_hot_querysets_use_indexes(self):
+        # Plans over empty tables would prove nothing
+        self.assertGreater(UserMilestone.objects.count(), self.USERS)
+        for name, queryset in self.hot_querysets():
+            with self.subTest(name):
+                self.assertEqual(sequential_scans(queryset), [], queryset.explain())
+
+
+# -------------------------------
+# PROGRESS LOG
+# -------------------------------
+@override_settings(PROGRESS_LOG_SYNC=True)
+class ProgressLogTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("log", "log@example.com", "pw")
+        self.goal = Goal.objects.create(user=self.user, title="Run", category="Health & Fitness")
+
+    def test_update_progress_logs_synchronously(self):
+        self.client.force_login(self.user)
+        self.client.post(reverse("update_progress", args=[self.goal.pk]), {"progress": 40})
+
+        self.assertEqual(
+            list(GoalProgressLog.objects.values_list("goal_id", "progress")),
+            [(self.goal.pk, 40)],
+        )
+
+    def test_buffer_flushes_in_one_insert_when_full(self):
+        buffer = ProgressLogBuffer(max_size=3, max_age=60)
+        buffer.add(self.goal.pk, 10)
+        buffer.add(self.goal.pk, 20)
+        self.assertEqual(GoalProgressLog.objects.count(), 0)
+
+        with CaptureQueriesContext(connection) as ctx:
+            buffer.add(self.goal.pk, 30)
+        inserts = [q for q in ctx.captured_queries if q["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(
+            sorted(GoalProgressLog.objects.values_list("progress", flat=True)), [10, 20, 30]
+        )
+
+    def test_flush_keeps_update_time_and_skips_deleted_goals(self):
+        buffer = ProgressLogBuffer(max_size=100, max_age=60)
+        doomed = Goal.objects.create(user=self.user, title="Gone", category="Health & Fitness")
+        before = timezone.now()
+        buffer.add(self.goal.pk, 50)
+        buffer.add(doomed.pk, 10)
+        doomed.delete()
+
+        self.assertEqual(buffer.flush(), 1)
+        log = GoalProgressLog.objects.get()
+        self.assertEqual(log.goal_id, self.goal.pk)
+        self.assertLess(log.created_at - before, timedelta(seconds=1))
+
+
+# -------------------------------
+# PROGRESS ROLLUPS
+# -------------------------------
+class ProgressRollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("roll", "roll@example.com", "pw")
+        self.goal = Goal.objects.create(user=self.user, title="Read", category="Learning")
+        # A Wednesday, well behind the rollup lag
+        self.wednesday = timezone.now().replace(
+            year=2026, month=3, day=4, hour=12, minute=0, second=0, microsecond=0
+        )
+
+    def log(self, progress, at):
+        GoalProgressLog.objects.create(goal=self.goal, progress=progress, created_at=at)
+
+    def test_rolls_up_by_day_and_iso_week(self):
+        self.log(20, self.wednesday)
+        self.log(60, self.wednesday + timedelta(hours=1))
+        self.log(100, self.wednesday + timedelta(days=1))
+
+        self.assertEqual(rollup_progress(), 3)
+
+        wednesday = ProgressDayRollup.objects.get(user=self.user, day=self.wednesday.date())
+        self.assertEqual(
+            (wednesday.updates, wednesday.average_progress, wednesday.max_progress, wednesday.completions),
+            (2, 40, 60, 0),
+        )
+        week = ProgressWeekRollup.objects.get(user=self.user)
+        self.assertEqual(week.week, week_of(self.wednesday.date()))
+        self.assertEqual(week.week.weekday(), 0)
+        self.assertEqual((week.updates, week.max_progress, week.completions), (3, 100, 1))
+
+    def test_only_rows_past_the_watermark_are_added(self):
+        now = timezone.now()
+        self.log(20, now - timedelta(hours=3))
+        self.assertEqual(rollup_progress(lag=timedelta(hours=2)), 1)
+        self.assertEqual(rollup_progress(lag=timedelta(hours=2)), 0)
+
+        self.log(40, now - timedelta(hours=1))
+        self.log(90, now)  # Inside the lag window
+        self.assertEqual(rollup_progress(), 1)
+
+        totals = ProgressDayRollup.objects.aggregate(
+            updates=Sum("updates"), progress=Sum("progress_total"), top=Max("max_progress")
+        )
+        self.assertEqual(totals, {"updates": 2, "progress": 60, "top": 40})
+
+    @override_settings(PROGRESS_LOG_SYNC=True)
+    def test_repeated_saves_are_not_updates_or_completions(self):
+        self.client.force_login(self.user)
+        url = reverse("update_progress", args=[self.goal.pk])
+        for progress in (40, 40, 100, 100, 100):
+            self.client.post(url, {"progress": progress})
+
+        self.assertEqual(GoalProgressLog.objects.count(), 2)
+        rollup_progress(lag=timedelta(0))
+        day = ProgressDayRollup.objects.get(user=self.user)
+        self.assertEqual((day.updates, day.completions), (2, 1))
+        self.assertEqual(UserActivityDay.objects.get(user=self.user).updates, day.updates)
+
+    def test_report_reads_the_rollups(self):
+        ProgressWeekRollup.objects.create(
+            user=self.user, week=week_of(timezone.localdate()), updates=4, progress_total=200
+        )
+        self.client.force_login(self.user)
+        data = self.client.get("/reports/activity/?period=week").json()
+
+        self.assertEqual(data["updates"], [4])
+        self.assertEqual(data["average"], [50])
+
+
+# -------------------------------
+# PROGRESS LOG COMPACTION
+# -------------------------------
+class ProgressLogCompactionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("compact", "compact@example.com", "pw")
+        self.goal = Goal.objects.create(user=self.user, title="Swim", category="Health & Fitness")
+        self.now = timezone.now()
+
+    def log(self, progress, days_ago, hour=12):
+        at = (self.now - timedelta(days=days_ago)).replace(hour=hour, minute=0)
+        return GoalProgressLog.objects.create(goal=self.goal, progress=progress, created_at=at)
+
+    def kept(self):
+        return sorted(GoalProgressLog.objects.values_list("progress", flat=True))
+
+    def test_tiers_keep_the_last_update_per_day_then_per_week(self):
+        for day, progress in ((2, 1), (2, 2)):
+            self.log(progress, day, hour=8 + progress)  # Raw tier
+        self.log(10, 100, hour=9)
+        self.log(11, 100, hour=15)  # Last of its day
+        self.log(20, 400)
+        self.log(21, 400, hour=18)
+        rollup_progress()
+
+        compact_progress_log()
+        self.assertEqual(self.kept(), [1, 2, 11, 21])
+
+        # Each remaining update is the last of its day and of its week
+        compact_progress_log(raw_days=0, daily_days=0)
+        self.assertEqual(self.kept(), [2, 11, 21])
+
+    def test_never_compacts_past_the_rollup_watermark(self):
+        self.log(10, 100, hour=9)
+        self.log(11, 100, hour=15)
+        self.assertEqual(compact_progress_log(), {"daily": 0, "weekly": 0})
+
+        rollup_progress()
+        self.assertEqual(compact_progress_log()["daily"], 1)
+
+    def test_resumes_from_the_watermark(self):
+        self.log(10, 100, hour=9)
+        self.log(11, 100, hour=15)
+        rollup_progress()
+        compact_progress_log()
+
+        # Rows written behind the watermark later are left as they are
+        self.log(12, 100, hour=16)
+        self.assertEqual(compact_progress_log()["daily"], 0)
+        self.assertEqual(self.kept(), [11, 12])
+
+
+class ProgressLogPartitionTests(TestCase):
+    def test_month_arithmetic_and_names(self):
+        self.assertEqual(add_months(date(2026, 11, 1), 2), date(2027, 1, 1))
+        self.assertEqual(add_months(date(2026, 1, 1), -1), date(2025, 12, 1))
+        self.assertEqual(partition_name(date(2026, 3, 1)), "goals_goalprogresslog_p202603")
+
+    @skipUnless(connection.vendor != "postgresql", "Only a plain table off Postgres")
+    def test_plain_table_elsewhere(self):
+        self.assertFalse(is_partitioned())
+        self.assertEqual(create_partitions(), [])
+        self.assertEqual(drop_partitions_before(date(2100, 1, 1)), [])
+
+    @skipUnless(connection.vendor == "postgresql", "Partitioning is Postgres only")
+    def test_migration_round_trip_keeps_rows_and_django_names(self):
+        migration = import_module("goals.migrations.0021_partition_progress_log")
+        goal = Goal.objects.create(
+            user=User.objects.create_user("part", "part@example.com", "pw"), title="Goal"
+        )
+        GoalProgressLog.objects.create(goal=goal, progress=30)
+
+        def constraints():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass",
+                    [migration.TABLE],
+                )
+                names = {row[0] for row in cursor.fetchall()}
+            indexes = connection.introspection.get_constraints(connection.cursor(), migration.TABLE)
+            return names | {name for name, info in indexes.items() if info["index"]}
+
+        with connection.schema_editor() as schema_editor:
+            expected = set(migration._names(schema_editor).values())
+            migration.unpartition_progress_log(None, schema_editor)
+        self.assertFalse(is_partitioned())
+        self.assertLessEqual(expected, constraints())
+
+        with connection.schema_editor() as schema_editor:
+            migration.partition_progress_log(None, schema_editor)
+        self.assertTrue(is_partitioned())
+        self.assertLessEqual(expected, constraints())
+
+        # Rows survive both swaps and new ids follow the old ones
+        later = GoalProgressLog.objects.create(goal=goal, progress=60)
+        self.assertEqual(
+            list(GoalProgressLog.objects.order_by("id").values_list("progress", flat=True)),
+            [30, 60],
+        )
+        self.assertGreater(later.id, GoalProgressLog.objects.get(progress=30).id)
+
+
+# -------------------------------
+# REPORTS
+# -------------------------------
+class ReportTimelineTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("time", "time@example.com", "pw")
+        self.client.force_login(self.user)
+        created = [
+            datetime(2026, 1, 5, 9), datetime(2026, 1, 5, 17),  # Monday
+            datetime(2026, 1, 7, 12),
+            datetime(2026, 2, 2, 8),
+        ]
+        for i, at in enumerate(created):
+            goal = Goal.objects.create(user=self.user, title=f"Goal {i}", category="Career")
+            Goal.objects.filter(pk=goal.pk).update(created_at=timezone.make_aware(at))
+
+    def timeline(self, **params):
+        return self.client.get("/reports/timeline/", params).json()
+
+    def test_cumulative_per_bucket(self):
+        self.assertEqual(
+            self.timeline(),
+            {
+                "granularity": "day",
+                "labels": ["2026-01-05", "2026-01-07", "2026-02-02"],
+                "values": [2, 3, 4],
+            },
+        )
+        month = self.timeline(granularity="month")
+        self.assertEqual(month["labels"], ["2026-01-01", "2026-02-01"])
+        self.assertEqual(month["values"], [3, 4])
+        self.assertEqual(self.timeline(granularity="week")["values"], [3, 4])
+
+    def test_range_keeps_earlier_goals_in_the_total(self):
+        data = self.timeline(**{"from": "2026-01-06", "to": "2026-01-31"})
+        self.assertEqual(data["labels"], ["2026-01-07"])
+        self.assertEqual(data["values"], [3])
+
+    def test_one_query_without_a_start_date(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.timeline(granularity="week")
+        # The series itself, after the conditional GET validator read
+        self.assertEqual(len(ctx.captured_queries), DashboardQueryCountTests.AUTH_QUERIES + 2)
+
+
+class TimelineDownsampleTests(TestCase):
+    def test_lttb_keeps_the_ends_and_the_spike(self):
+        x = list(range(1000))
+        y = [0] * 1000
+        y[437] = 50
+
+        kept = list(lttb(x, y, 20))
+        self.assertEqual(len(kept), 20)
+        self.assertEqual((kept[0], kept[-1]), (0, 999))
+        self.assertIn(437, kept)
+        self.assertEqual(kept, sorted(kept))
+
+    def test_short_series_are_returned_whole(self):
+        self.assertEqual(list(lttb([1, 2, 3], [4, 5, 6], 10)), [0, 1, 2])
+
+    def test_timeline_points_are_downsampled_and_cached(self):
+        user = User.objects.create_user("long", "long@example.com", "pw")
+        self.client.force_login(user)
+        Goal.objects.bulk_create(
+            [Goal(user=user, title=f"Goal {i}") for i in range(300)]
+        )
+        start = timezone.make_aware(datetime(2020, 1, 1))
+        for goal in Goal.objects.filter(user=user):
+            Goal.objects.filter(pk=goal.pk).update(created_at=start + timedelta(days=goal.pk))
+        rebuild_user_stats([user.id])  # bulk_create skips the signals
+        cache.clear()
+
+        data = self.client.get("/reports/timeline/", {"points": 40}).json()
+        self.assertEqual(len(data["labels"]), 40)
+        self.assertEqual(data["values"][-1], 300)
+
+        with CaptureQueriesContext(connection) as ctx:
+            again = self.client.get("/reports/timeline/", {"points": 40}).json()
+        self.assertEqual(again, data)
+        # The validator read also keys the cache; no series query
+        self.assertEqual(len(ctx.captured_queries), DashboardQueryCountTests.AUTH_QUERIES + 1)
+
+
+class ReportSummaryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("sum", "sum@example.com", "pw")
+        self.client.force_login(self.user)
+        for i, progress in enumerate((100, 40, 100)):
+            Goal.objects.create(
+                user=self.user, title=f"Goal {i}", category="Health & Fitness", progress=progress
+            )
+
+    def test_matches_the_per_chart_endpoints(self):
+        summary = self.client.get("/reports/summary/").json()
+
+        for chart in ("timeline", "status", "categories", "completions", "activity"):
+            with self.subTest(chart):
+                self.assertEqual(summary[chart], self.client.get(f"/reports/{chart}/").json())
+        self.assertEqual(summary["completions"], {"completed": 2, "pending": 1})
+
+    def test_one_query_per_dataset_source(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get("/reports/summary/")
+        # Validators, stats row, category totals, timeline and activity rollups
+        self.assertEqual(len(ctx.captured_queries), DashboardQueryCountTests.AUTH_QUERIES + 5)
+
+    def test_downsampled_summary_reuses_the_stats_row(self):
+        # The reports page asks for a downsampled timeline
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            first = self.client.get("/reports/summary/", {"points": 60}).json()
+        self.assertEqual(len(ctx.captured_queries), DashboardQueryCountTests.AUTH_QUERIES + 5)
+
+        with CaptureQueriesContext(connection) as ctx:
+            again = self.client.get("/reports/summary/", {"points": 60}).json()
+        self.assertEqual(again, first)
+        # No timeline query once the series is cached
+        self.assertEqual(len(ctx.captured_queries), DashboardQueryCountTests.AUTH_QUERIES + 4)
+
+
+class ConditionalReportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("etag", "etag@example.com", "pw")
+        self.client.force_login(self.user)
+        self.goal = Goal.objects.create(user=self.user, title="Cook", category="Health & Fitness")
+
+    def test_unchanged_data_is_answered_with_304_after_one_query(self):
+        first = self.client.get("/reports/summary/")
+        self.assertIn("no-cache", first["Cache-Control"])
+        self.assertIn("private", first["Cache-Control"])
+
+        with CaptureQueriesContext(connection) as ctx:
+            again = self.client.get("/reports/summary/", headers={"if-none-match": first["ETag"]})
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(len(ctx.captured_queries), DashboardQueryCountTests.AUTH_QUERIES + 1)
+
+        since = self.client.get(
+            "/reports/summary/", headers={"if-modified-since": first["Last-Modified"]}
+        )
+        self.assertEqual(since.status_code, 304)
+
+    def test_last_modified_moves_at_midnight(self):
+        UserGoalStats.objects.filter(user=self.user).update(
+            changed_at=timezone.now() - timedelta(days=2)
+        )
+        first = self.client.get("/reports/summary/")
+        midnight = timezone.make_aware(datetime.combine(timezone.localdate(), datetime.min.time()))
+        self.assertEqual(first["Last-Modified"], http_date(midnight.timestamp()))
+
+        # The week windows moved overnight, so yesterday's copy is stale
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        with mock.patch("django.utils.timezone.localdate", return_value=tomorrow):
+            since = self.client.get(
+                "/reports/summary/", headers={"if-modified-since": first["Last-Modified"]}
+            )
+        self.assertEqual(since.status_code, 200)
+
+    def test_a_write_or_other_parameters_change_the_etag(self):
+        etag = self.client.get("/reports/timeline/")["ETag"]
+        self.assertNotEqual(
+            self.client.get("/reports/timeline/", {"granularity": "week"})["ETag"], etag
+        )
+
+        self.goal.progress = 30
+        self.goal.save()
+        response = self.client.get("/reports/timeline/", headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+
+
+# -------------------------------
+# EXPORT
+# -------------------------------
+class GoalExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("export", "export@example.com", "pw")
+        self.client.force_login(self.user)
+        self.goal = Goal.objects.create(user=self.user, title="Learn, Spanish", category="Learning")
+        self.quiet = Goal.objects.create(user=self.user, title="Quiet", category="Other")
+        for progress in (10, 35):
+            GoalProgressLog.objects.create(goal=self.goal, progress=progress)
+        other = User.objects.create_user("other", "other@example.com", "pw")
+        Goal.objects.create(user=other, title="Not mine", category="Other")
+
+    def test_csv_has_one_row_per_log_entry(self):
+        response = self.client.get(reverse("export_goals_csv"))
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(b"".join(response.streaming_content).decode().splitlines()))
+
+        self.assertEqual(rows[0][:2], ["goal_id", "title"])
+        self.assertEqual(
+            [(row[1], row[7]) for row in rows[1:]],
+            [("Learn, Spanish", "10"), ("Learn, Spanish", "35"), ("Quiet", "")],
+        )
+
+    def test_ndjson_streams_plain_values(self):
+        response = self.client.get(reverse("export_goals_ndjson"))
+        records = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[-1]["logged_progress"], None)
+        self.assertEqual(records[0]["logged_progress"], 10)
+
+
+# -------------------------------
+# PLATFORM ANALYTICS
+# -------------------------------
+class AnalyticsSnapshotTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user("staff", "staff@example.com", "pw", is_staff=True)
+        member = User.objects.create_user("member", "member@example.com", "pw")
+        for progress, category in ((100, "Career"), (40, "Career"), (0, "Travel")):
+            Goal.objects.create(user=member, title="Goal", category=category, progress=progress)
+
+    def test_snapshot_totals(self):
+        snapshot = snapshot_analytics()
+
+        self.assertEqual(snapshot.total_users, 2)
+        self.assertEqual(snapshot.new_users, 2)
+        self.assertEqual(
+            (snapshot.total_goals, snapshot.completed_goals, snapshot.completion_rate), (3, 1, 33)
+        )
+        self.assertEqual(snapshot.categories, {"Career": 2, "Travel": 1})
+        # Re-running the same day overwrites the row
+        snapshot_analytics()
+        self.assertEqual(AnalyticsSnapshot.objects.count(), 1)
+
+    def test_users_without_stats_rows_are_counted(self):
+        # As if the member's goals predated the stats tables
+        UserGoalStats.objects.all().delete()
+        UserCategoryStats.objects.all().delete()
+
+        snapshot = snapshot_analytics()
+        self.assertEqual((snapshot.total_goals, snapshot.completed_goals), (3, 1))
+        self.assertEqual(snapshot.categories, {"Career": 2, "Travel": 1})
+
+    def test_page_reads_only_the_snapshots(self):
+        snapshot_analytics()
+        self.client.force_login(self.staff)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("admin_analytics"))
+        self.assertContains(response, "33%")
+        tables = {
+            table for q in ctx.captured_queries[DashboardQueryCountTests.AUTH_QUERIES:]
+            for table in re.findall(r'FROM "(\w+)"', q["sql"])
+        }
+        self.assertEqual(tables, {"goals_analyticssnapshot"})
@@ -4,10 +4,15 @@ from . import views
 urlpatterns = [
     path("dashboard/", views.dashboard, name="dashboard"),
     path("list/", views.goals_page, name="goals_page"),
+    path("list/more/", views.goals_page_more, name="goals_page_more"),
     path("create/", views.create_goal, name="create_goal"),
     path("update-progress/<int:pk>/", views.update_progress, name="update_progress"),
     path("<int:pk>/delete/", views.delete_goal, name="delete_goal"),
+    path("export.csv", views.export_goals, {"fmt": "csv"}, name="export_goals_csv"),
+    path("export.ndjson", views.export_goals, {"fmt": "ndjson"}, name="export_goals_ndjson"),
     path("milestones/", views.milestones_page, name="milestones_page"),
+    path("admin/analytics/", views.admin_analytics, name="admin_analytics"),
     path("admin/user-goals/<int:user_id>/", views.admin_user_goals, name="admin_user_goals"),
+    path("admin/user-goals/<int:user_id>/more/", views.admin_user_goals_more, name="admin_user_goals_more"),
     path("admin/delete-goal/<int:goal_id>/", views.admin_delete_goal, name="admin_delete_goal"),
 ]
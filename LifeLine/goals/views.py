@@ -6,118 +6,100 @@ from django.utils import timezone
 from django.contrib.auth.models import User
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.db.models import Q
-from django.http import JsonResponse
-from django.db.models import Count
-from django.db.models.functions import TruncDate
-from .models import Goal, GoalProgressLog
-from .models import Milestone, UserMilestone
+from django.http import JsonResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
+from urllib.parse import urlencode
+from django.utils.functional import SimpleLazyObject
+from .conditional import data_generation, user_data_condition
+from .models import Goal
+from .models import AnalyticsSnapshot, Milestone, UserMilestone
+from .pagination import PLAIN_SORTS, keyset_page
+from .progress_log import record_progress
+from . import export, reports
+from .search import search_goals
+from .stats import dashboard_stats, get_user_stats, recent_achievements
 
 
 # DASHBOARD PAGE #
 @login_required
 def dashboard(request):
     user = request.user
-    user_goals = Goal.objects.filter(user=user)
+    goal_stats = get_user_stats(user.id)
 
-    # -------------------------------
-    # GOAL STATS
-    # -------------------------------
-    total_goals = user_goals.count()
-    completed_goals = user_goals.filter(status="Completed").count()
-    in_progress_goals = user_goals.filter(status="In Progress").count()
-    not_started_goals = user_goals.filter(status="Not Started").count()
-
-    completion_rate = (completed_goals / total_goals) * 100 if total_goals > 0 else 0
+    # Everything below is lazy: when the page fragments for this data
+    # generation are cached, none of it is queried
 
     # -------------------------------
-    # RECENT GOALS
+    # RECENT ACHIEVEMENTS
     # -------------------------------
-    recent_goals = user_goals.order_by('-created_at')[:3]
+    # Also carries the achievement counts for the stat cards
+    recent = SimpleLazyObject(lambda: recent_achievements(user.id))
 
     # -------------------------------
-    # USER ACHIEVEMENTS ✅ (FIXED)
+    # GOAL & ACHIEVEMENT STATS
     # -------------------------------
-    user_achievements = UserMilestone.objects.filter(
-        user=user,
-        unlocked=True
-    )
-
-    achievements_count = user_achievements.count()
-
-    recent_achievements = user_achievements.select_related("milestone") \
-                                           .order_by('-unlocked_at')[:3]
-
-    # -------------------------------
-    # STREAK CALCULATION ✅ (FIXED)
-    # -------------------------------
-    streak = 0
-    today = timezone.now().date()
-
-    completion_dates = user_achievements.values_list("unlocked_at", flat=True)
-    completion_set = set([d.date() for d in completion_dates if d])
-
-    while today in completion_set:
-        streak += 1
-        today -= timedelta(days=1)
+    stats = SimpleLazyObject(lambda: dashboard_stats(user.id, goal_stats, recent))
 
     # -------------------------------
-    # FINAL STATS
+    # RECENT GOALS
     # -------------------------------
-    stats = {
-        "total_goals": total_goals,
-        "completed_goals": completed_goals,
-        "in_progress_goals": in_progress_goals,
-        "not_started_goals": not_started_goals,
-        "achievements": achievements_count,
-        "streak": streak,
-        "completion_rate": round(completion_rate),
-    }
+    recent_goals = Goal.objects.filter(user=user).order_by('-created_at')[:3]
 
     context = {
         "stats": stats,
         "recent_goals": recent_goals,
-        "recent_achievements": recent_achievements,
+        "recent_achievements": recent,
+        "generation": goal_stats.generation,
+        # The streak depends on the date as well as on the data
+        "today": timezone.localdate(),
     }
 
     return render(request, "dashboard.html", context)
 
 
 # GOALS PAGE #
-@login_required
-def goals_page(request):
-    user = request.user
+GOALS_PAGE_SIZE = 24
+
+
+def filtered_goals(user, params):
+    """The user's goals narrowed by the goals page filters."""
     goals = Goal.objects.filter(user=user)
 
     # FILTERS
-    search = request.GET.get("search", "")
-    category = request.GET.get("category", "All")
-    status = request.GET.get("status", "All")
-    sort = request.GET.get("sort", "")
+    filters = {
+        "search": params.get("search", ""),
+        "category": params.get("category", "All"),
+        "status": params.get("status", "All"),
+        "sort": params.get("sort", ""),
+    }
 
-    if search:
-        goals = goals.filter(
-            Q(title__icontains=search) |
-            Q(description__icontains=search)
-        )
+    if filters["search"]:
+        # Indexed full-text match; rank by relevance unless a sort was picked
+        goals = search_goals(goals, filters["search"])
+        if not filters["sort"]:
+            filters["sort"] = "relevance"
+    elif filters["sort"] == "relevance":
+        # Nothing to rank by without a search
+        filters["sort"] = ""
 
-    if category != "All":
-        goals = goals.filter(category=category)
+    if filters["category"] != "All":
+        goals = goals.filter(category=filters["category"])
 
-    if status != "All":
-        goals = goals.filter(status=status)
+    if filters["status"] != "All":
+        goals = goals.filter(status=filters["status"])
 
-    if sort == "date_asc":
-        goals = goals.order_by("created_at")
-    elif sort == "date_desc":
-        goals = goals.order_by("-created_at")
-    elif sort == "progress_asc":
-        goals = goals.order_by("progress")
-    elif sort == "progress_desc":
-        goals = goals.order_by("-progress")
-    else:
-        # default ordering
-        goals = goals.order_by("-created_at")
+    return goals, filters
+
+
+@login_required
+def goals_page(request):
+    user = request.user
+    goals, filters = filtered_goals(user, request.GET)
+
+    # Ordered by the sort mode with an id tiebreaker, one page at a time
+    page = SimpleLazyObject(
+        lambda: keyset_page(goals, filters["sort"], page_size=GOALS_PAGE_SIZE)
+    )
 
     # categories = ["All"] + list(goals.values_list("category", flat=True).distinct())
     all_categories = [c[0] for c in Goal._meta.get_field('category').choices]
@@ -125,16 +107,34 @@ def goals_page(request):
     statuses = ["All", "Not Started", "In Progress", "Completed"]
 
     context = {
-        "goals": goals,
-        "search": search,
-        "category": category,
+        "page": page,
+        "search": filters["search"],
+        "category": filters["category"],
         "categories": categories,
-        "status": status,
+        "status": filters["status"],
         "statuses": statuses,
+        "sort": filters["sort"],
+        "filter_query": urlencode(filters),
+        "generation": get_user_stats(user.id).generation,
     }
     return render(request, "goals_page.html", context)
 
 
+# LOAD MORE (JSON)
+@login_required
+@user_data_condition
+def goals_page_more(request):
+    goals, filters = filtered_goals(request.user, request.GET)
+    page = keyset_page(
+        goals, filters["sort"], request.GET.get("cursor"), page_size=GOALS_PAGE_SIZE
+    )
+
+    return JsonResponse({
+        "html": render_to_string("goal_cards.html", {"goals": page.items}, request=request),
+        "next_cursor": page.next_cursor,
+    })
+
+
 @login_required
 def create_goal(request):
     if request.method == "POST":
@@ -160,7 +160,7 @@ def create_goal(request):
             except:
                 parsed_date = None
 
-        Goal.objects.create(
+        goal = Goal.objects.create(
             user=request.user,
             title=title,
             description=description,
@@ -169,6 +169,8 @@ def create_goal(request):
         )
 
         messages.success(request, f"Goal '{title}' created successfully!")
+        for milestone in goal.unlocked_milestones:
+            messages.success(request, f"Achievement Unlocked: {milestone.title}")
         return redirect("goals_page")
 
 
@@ -183,35 +185,18 @@ def update_progress(request, pk):
         except ValueError:
             new_progress = goal.progress
 
+        previous = goal.progress
         goal.progress = max(0, min(100, new_progress))
         goal.save()
+        # History holds changes only, as UserActivityDay counts them
+        if goal.progress != previous:
+            record_progress(goal)
 
-        # 2️⃣ Ensure all UserMilestone rows exist for this user
-        milestones = Milestone.objects.filter(milestone_type="progress")
-        for milestone in milestones:
-            UserMilestone.objects.get_or_create(user=request.user, milestone=milestone)
-
-        # 3️⃣ Find milestones that should be unlocked
-        unlocked = UserMilestone.objects.filter(
-            user=request.user,
-            unlocked=False,
-            milestone__milestone_type="progress",
-            milestone__required_value__lte=goal.progress
-        )
-
-        # Match by category (case-insensitive) or if milestone has no category
-        unlocked = unlocked.filter(
-            Q(milestone__category__iexact=goal.category) | Q(milestone__category__isnull=True)
-        )
-
-        # 4️⃣ Unlock milestones and show toast messages
-        for um in unlocked:
-            um.unlocked = True
-            um.unlocked_at = timezone.now()
-            um.save()
+        # 2️⃣ Show a toast for every milestone the save unlocked
+        for milestone in goal.unlocked_milestones:
             messages.success(
                 request,
-                f"Achievement Unlocked: {um.milestone.title}"
+                f"Achievement Unlocked: {milestone.title}"
             )
 
     return redirect("goals_page")
@@ -224,30 +209,52 @@ def delete_goal(request, pk):
     return redirect("goals_page")
 
 
-# ACHIEVEMENT PAGE #
+# EXPORT #
+EXPORT_FORMATS = {
+    # format -> (line generator, content type)
+    "csv": (export.csv_lines, "text/csv"),
+    "ndjson": (export.ndjson_lines, "application/x-ndjson"),
+}
+
+
 @login_required
-def milestones_page(request):
-    milestones = Milestone.objects.all()
-    user_milestones = UserMilestone.objects.filter(
-        user=request.user,
-        milestone__in=milestones
+def export_goals(request, fmt):
+    lines, content_type = EXPORT_FORMATS[fmt]
+    response = StreamingHttpResponse(
+        lines(export.export_rows(request.user.id)), content_type=content_type
     )
+    response["Content-Disposition"] = f'attachment; filename="lifeline-goals.{fmt}"'
+    return response
 
-    milestone_map = {
-        um.milestone_id: um for um in user_milestones
-    }
 
-    final_data = []
-    for m in milestones:
-        user_m = milestone_map.get(m.id)
-        final_data.append({
-            "milestone": m,
-            "unlocked": user_m.unlocked if user_m else False,
-            "date": user_m.unlocked_at if user_m else None
-        })
+# ACHIEVEMENT PAGE #
+@login_required
+def milestones_page(request):
+    def milestone_data():
+        milestones = Milestone.objects.all()
+        user_milestones = UserMilestone.objects.filter(
+            user=request.user,
+            milestone__in=milestones
+        )
+
+        milestone_map = {
+            um.milestone_id: um for um in user_milestones
+        }
 
+        final_data = []
+        for m in milestones:
+            user_m = milestone_map.get(m.id)
+            final_data.append({
+                "milestone": m,
+                "unlocked": user_m.unlocked if user_m else False,
+                "date": user_m.unlocked_at if user_m else None
+            })
+        return final_data
+
+    # Only built when the cached fragment for this generation is missing
     return render(request, "milestones.html", {
-        "milestones": final_data
+        "milestones": SimpleLazyObject(milestone_data),
+        "generation": get_user_stats(request.user.id).generation,
     })
 
 
@@ -257,70 +264,110 @@ def reports_page(request):
     return render(request, "reports.html")
 
 
-# TIMELINE CHART
+# ALL CHARTS IN ONE RESPONSE
 @login_required
-def report_timeline(request):
-    goals = Goal.objects.filter(user=request.user).order_by("created_at")
+@user_data_condition
+def report_summary(request):
+    return JsonResponse(reports.report_summary(request.user.id, request.GET))
 
-    data = {
-        "labels": [g.created_at.strftime("%Y-%m-%d") for g in goals],
-        "values": list(range(1, goals.count() + 1)),
-    }
 
-    return JsonResponse(data)
+# Per-chart endpoints, kept for clients that still call them
+@login_required
+@user_data_condition
+def report_timeline(request):
+    return JsonResponse(
+        reports.timeline_data(request.user.id, request.GET, data_generation(request))
+    )
 
 
-# STATUS DISTRIBUTION
 @login_required
+@user_data_condition
 def report_status(request):
-    data = (
-        Goal.objects.filter(user=request.user)
-        .values("status")
-        .annotate(total=Count("status"))
-    )
-
-    return JsonResponse(list(data), safe=False)
+    goal_stats = get_user_stats(request.user.id)
+    return JsonResponse(reports.status_data(goal_stats), safe=False)
 
 
-# CATEGORY DISTRIBUTION
 @login_required
+@user_data_condition
 def report_categories(request):
-    data = (
-        Goal.objects.filter(user=request.user)
-        .values("category")
-        .annotate(total=Count("category"))
-    )
-
-    return JsonResponse(list(data), safe=False)
+    return JsonResponse(reports.category_data(request.user.id), safe=False)
 
 
-# COMPLETION COUNTS
 @login_required
+@user_data_condition
 def report_completions(request):
-    completed = Goal.objects.filter(user=request.user, status="Completed").count()
-    pending = Goal.objects.filter(user=request.user).exclude(
-        status="Completed"
-    ).count()
+    goal_stats = get_user_stats(request.user.id)
+    return JsonResponse(reports.completions_data(goal_stats))
 
-    return JsonResponse(
-        {
-            "completed": completed,
-            "pending": pending,
-        }
-    )
+
+@login_required
+@user_data_condition
+def report_activity(request):
+    return JsonResponse(reports.activity_data(request.user.id, request.GET))
+
+
+# =============================
+# ADMIN – PLATFORM ANALYTICS
+# =============================
+ANALYTICS_DAYS = 30
+
+
+@staff_member_required
+def admin_analytics(request):
+    # Reads only the snapshots written by `manage.py snapshot_analytics`
+    snapshots = list(AnalyticsSnapshot.objects.order_by("-day")[:ANALYTICS_DAYS])
+    snapshots.reverse()
+    latest = snapshots[-1] if snapshots else None
+
+    return render(request, "admin_analytics.html", {
+        "latest": latest,
+        "trend": {
+            "labels": [s.day.strftime("%Y-%m-%d") for s in snapshots],
+            "total_goals": [s.total_goals for s in snapshots],
+            "active_users": [s.active_users for s in snapshots],
+            "weekly_active_users": [s.weekly_active_users for s in snapshots],
+        },
+    })
 
 
 # =============================
 # ADMIN – VIEW USER GOALS
 # =============================
+ADMIN_GOALS_PAGE_SIZE = 50
+
+
 @staff_member_required
 def admin_user_goals(request, user_id):
     selected_user = get_object_or_404(User, id=user_id)
-    goals = Goal.objects.filter(user=selected_user).order_by("-created_at")
+    sort = request.GET.get("sort", "")
+    page = keyset_page(
+        Goal.objects.filter(user=selected_user), sort, page_size=ADMIN_GOALS_PAGE_SIZE,
+        sorts=PLAIN_SORTS,
+    )
 
     return render(request, "admin_user_goals.html", {
         "selected_user": selected_user,
-        "goals": goals,
+        "goals": page.items,
+        "next_cursor": page.next_cursor,
+        "sort": sort,
+    })
+
+
+@staff_member_required
+@user_data_condition
+def admin_user_goals_more(request, user_id):
+    selected_user = get_object_or_404(User, id=user_id)
+    page = keyset_page(
+        Goal.objects.filter(user=selected_user),
+        request.GET.get("sort", ""),
+        request.GET.get("cursor"),
+        page_size=ADMIN_GOALS_PAGE_SIZE,
+        sorts=PLAIN_SORTS,
+    )
+
+    return JsonResponse({
+        "html": render_to_string("admin_goal_rows.html", {"goals": page.items}, request=request),
+        "next_cursor": page.next_cursor,
     })
 
 
@@ -0,0 +1,28 @@
+/* ============================
+   LOAD MORE (keyset pagination)
+============================ */
+document.addEventListener("DOMContentLoaded", () => {
+    document.querySelectorAll("[data-load-more]").forEach(button => {
+        button.addEventListener("click", () => {
+            const target = document.getElementById(button.dataset.target);
+            const cursor = encodeURIComponent(button.dataset.cursor);
+            button.disabled = true;
+
+            fetch(`${button.dataset.url}&cursor=${cursor}`)
+                .then(res => res.json())
+                .then(data => {
+                    target.insertAdjacentHTML("beforeend", data.html);
+
+                    if (data.next_cursor) {
+                        button.dataset.cursor = data.next_cursor;
+                        button.disabled = false;
+                    } else {
+                        button.closest(".load-more-row").remove();
+                    }
+                })
+                .catch(() => {
+                    button.disabled = false;
+                });
+        });
+    });
+});
@@ -18,137 +18,194 @@ function animateCounter(id, target) {
 /* ============================
    TIMELINE CHART
 ============================ */
-fetch("/reports/timeline/")
-    .then(res => res.json())
-    .then(data => {
-        new Chart(document.getElementById("timelineChart"), {
-            type: "line",
-            data: {
-                labels: data.labels,
-                datasets: [{
-                    label: "Total Goals Over Time",
-                    data: data.values,
-                    borderColor: "#16a34a",
-                    backgroundColor: "rgba(22,163,74,0.2)",
-                    tension: 0.4,
-                    fill: true,
-                    pointRadius: 5,
-                    pointBackgroundColor: "#14532d",
-                }]
-            },
-            options: {
-                responsive: true,
-                plugins: {
-                    tooltip: {
-                        enabled: true,
-                        backgroundColor: '#16a34a',
-                        titleColor: '#fff',
-                        bodyColor: '#fff',
-                        padding: 8,
-                    },
-                    legend: { display: false }
+function renderTimeline(data) {
+    new Chart(document.getElementById("timelineChart"), {
+        type: "line",
+        data: {
+            labels: data.labels,
+            datasets: [{
+                label: "Total Goals Over Time",
+                data: data.values,
+                borderColor: "#16a34a",
+                backgroundColor: "rgba(22,163,74,0.2)",
+                tension: 0.4,
+                fill: true,
+                pointRadius: 5,
+                pointBackgroundColor: "#14532d",
+            }]
+        },
+        options: {
+            responsive: true,
+            plugins: {
+                tooltip: {
+                    enabled: true,
+                    backgroundColor: '#16a34a',
+                    titleColor: '#fff',
+                    bodyColor: '#fff',
+                    padding: 8,
                 },
-                scales: {
-                    x: { title: { display: true, text: 'Date' } },
-                    y: { title: { display: true, text: 'Total Goals' }, beginAtZero: true }
-                }
+                legend: { display: false }
+            },
+            scales: {
+                x: { title: { display: true, text: 'Date' } },
+                y: { title: { display: true, text: 'Total Goals' }, beginAtZero: true }
             }
-        });
+        }
     });
+}
 
 /* ============================
    STATUS CHART
 ============================ */
-fetch("/reports/status/")
-    .then(res => res.json())
-    .then(data => {
-        new Chart(document.getElementById("statusChart"), {
-            type: "pie",
-            data: {
-                labels: data.map(item => item.status),
-                datasets: [{
-                    data: data.map(item => item.total),
-                    backgroundColor: ["#16a34a", "#facc15", "#ef4444"]
-                }]
-            },
-            options: {
-                responsive: true,
-                plugins: {
-                    tooltip: {
-                        enabled: true,
-                        backgroundColor: '#16a34a',
-                        titleColor: '#fff',
-                        bodyColor: '#fff'
-                    },
-                    legend: { position: 'bottom' }
-                }
+function renderStatus(data) {
+    new Chart(document.getElementById("statusChart"), {
+        type: "pie",
+        data: {
+            labels: data.map(item => item.status),
+            datasets: [{
+                data: data.map(item => item.total),
+                backgroundColor: ["#16a34a", "#facc15", "#ef4444"]
+            }]
+        },
+        options: {
+            responsive: true,
+            plugins: {
+                tooltip: {
+                    enabled: true,
+                    backgroundColor: '#16a34a',
+                    titleColor: '#fff',
+                    bodyColor: '#fff'
+                },
+                legend: { position: 'bottom' }
             }
-        });
+        }
     });
+}
 
 /* ============================
    CATEGORY CHART
 ============================ */
-fetch("/reports/categories/")
-    .then(res => res.json())
-    .then(data => {
-        new Chart(document.getElementById("categoryChart"), {
-            type: "bar",
-            data: {
-                labels: data.map(item => item.category),
-                datasets: [{
-                    label: "Goals per Category",
-                    data: data.map(item => item.total),
-                    backgroundColor: "#16a34a"
-                }]
-            },
-            options: {
-                responsive: true,
-                plugins: {
-                    tooltip: {
-                        enabled: true,
-                        backgroundColor: '#16a34a',
-                        titleColor: '#fff',
-                        bodyColor: '#fff'
-                    },
-                    legend: { display: false }
+function renderCategories(data) {
+    new Chart(document.getElementById("categoryChart"), {
+        type: "bar",
+        data: {
+            labels: data.map(item => item.category),
+            datasets: [{
+                label: "Goals per Category",
+                data: data.map(item => item.total),
+                backgroundColor: "#16a34a"
+            }]
+        },
+        options: {
+            responsive: true,
+            plugins: {
+                tooltip: {
+                    enabled: true,
+                    backgroundColor: '#16a34a',
+                    titleColor: '#fff',
+                    bodyColor: '#fff'
                 },
-                scales: {
-                    y: { beginAtZero: true }
-                }
+                legend: { display: false }
+            },
+            scales: {
+                y: { beginAtZero: true }
             }
-        });
+        }
     });
+}
 
 /* ============================
    COMPLETION SUMMARY
 ============================ */
-fetch("/reports/completions/")
-    .then(res => res.json())
-    .then(data => {
-        animateCounter("completedCount", data.completed);
-        animateCounter("pendingCount", data.pending);
+function renderCompletions(data) {
+    animateCounter("completedCount", data.completed);
+    animateCounter("pendingCount", data.pending);
 
-        new Chart(document.getElementById("completionChart"), {
-            type: "doughnut",
-            data: {
-                labels: ["Completed", "Pending"],
-                datasets: [{
-                    data: [data.completed, data.pending],
-                    backgroundColor: ["#16a34a", "#e5e7eb"]
-                }]
-            },
-            options: {
-                responsive: true,
-                plugins: {
-                    tooltip: {
-                        enabled: true,
-                        backgroundColor: '#16a34a',
-                        titleColor: '#fff',
-                        bodyColor: '#fff'
-                    },
-                    legend: { position: 'bottom' }
+    new Chart(document.getElementById("completionChart"), {
+        type: "doughnut",
+        data: {
+            labels: ["Completed", "Pending"],
+            datasets: [{
+                data: [data.completed, data.pending],
+                backgroundColor: ["#16a34a", "#e5e7eb"]
+            }]
+        },
+        options: {
+            responsive: true,
+            plugins: {
+                tooltip: {
+                    enabled: true,
+                    backgroundColor: '#16a34a',
+                    titleColor: '#fff',
+                    bodyColor: '#fff'
+                },
+                legend: { position: 'bottom' }
+            }
+        }
+    });
+}
+
+/* ============================
+   WEEKLY ACTIVITY CHART
+============================ */
+function renderActivity(data) {
+    new Chart(document.getElementById("activityChart"), {
+        type: "bar",
+        data: {
+            labels: data.labels,
+            datasets: [
+                {
+                    label: "Progress Updates",
+                    data: data.updates,
+                    backgroundColor: "#16a34a",
+                    yAxisID: "y",
+                },
+                {
+                    type: "line",
+                    label: "Average Progress (%)",
+                    data: data.average,
+                    borderColor: "#facc15",
+                    backgroundColor: "#facc15",
+                    tension: 0.4,
+                    yAxisID: "percent",
                 }
+            ]
+        },
+        options: {
+            responsive: true,
+            plugins: {
+                tooltip: {
+                    enabled: true,
+                    backgroundColor: '#16a34a',
+                    titleColor: '#fff',
+                    bodyColor: '#fff'
+                },
+                legend: { position: 'bottom' }
+            },
+            scales: {
+                x: { title: { display: true, text: 'Week of' } },
+                y: { beginAtZero: true, title: { display: true, text: 'Updates' } },
+                percent: { position: 'right', min: 0, max: 100, grid: { drawOnChartArea: false } }
             }
-        });
+        }
+    });
+}
+
+/* ============================
+   LOAD EVERY CHART IN ONE REQUEST
+============================ */
+// About one timeline point per 4px of chart width; the server downsamples
+// longer histories to that many points
+const timelinePoints = Math.max(
+    50, Math.round(document.getElementById("timelineChart").clientWidth / 4)
+);
+
+fetch(`/reports/summary/?points=${timelinePoints}`)
+    .then(res => res.json())
+    .then(data => {
+        renderTimeline(data.timeline);
+        renderStatus(data.status);
+        renderCategories(data.categories);
+        renderCompletions(data.completions);
+        renderActivity(data.activity);
     });
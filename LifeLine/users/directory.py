@@ -0,0 +1,166 @@
+"""
+The staff user list: search, sorting, goal counts and a cheap total.
+
+Goal counts come from the materialized ``UserGoalStats`` row (see
+goals.stats) joined in the same query as the users, so a page of users
+is one query whatever its size. A user with goals but no stats row yet
+is counted from the goals table instead.
+
+Pages are keyset-paginated with goals.pagination. The id, username and
+joined sorts walk an index, so deep pages cost the same as the first
+one. The goals and completion sorts order by a computed join expression
+that no index can serve: keyset paging still avoids OFFSET, but every
+page sorts the whole (filtered) user table.
+
+Search on Postgres matches usernames and emails by substring or trigram
+similarity, both served by the pg_trgm GIN indexes from migration
+users 0002, and ranks by similarity. Elsewhere it falls back to prefix
+matching. Queries shorter than ``MIN_QUERY_LENGTH`` are not run: they
+have no full trigram and would match most of the table anyway.
+"""
+
+from datetime import datetime
+
+from django.contrib.auth.models import User
+from django.db import connections
+from django.db.models import (
+    BooleanField, Case, Count, F, FloatField, IntegerField, OuterRef, Q, Subquery, Value, When,
+)
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Coalesce
+
+from goals.models import Goal
+
+# sort mode -> (field, descending, parse); see goals.pagination
+USER_SORTS = {
+    "id": ("id", False, int),
+    "-id": ("id", True, int),
+    "username": ("username", False, str),
+    "-username": ("username", True, str),
+    "joined": ("date_joined", False, datetime.fromisoformat),
+    "-joined": ("date_joined", True, datetime.fromisoformat),
+    # Computed per user, so these two sort the whole table on every page
+    "goals": ("total_goals", False, int),
+    "-goals": ("total_goals", True, int),
+    "completion": ("completion_rate", False, float),
+    "-completion": ("completion_rate", True, float),
+    # Best match first; only meaningful with a search query
+    "relevance": ("search_rank", True, float),
+}
+DEFAULT_USER_SORT = "id"
+
+MIN_QUERY_LENGTH = 3
+
+# Below this many rows an exact COUNT is cheap enough
+EXACT_COUNT_LIMIT = 10_000
+
+
+def _goal_count(**filters):
+    """Fallback for users without a stats row; COALESCE skips it for the rest."""
+    counts = (
+        Goal.objects.filter(user_id=OuterRef("pk"), **filters)
+        .order_by()
+        .values("user_id")
+        .annotate(n=Count("id"))
+        .values("n")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def admin_users(query=""):
+    """
+    Users matching ``query``, annotated with their goal counts and ``search_rank``.
+
+    ``query`` should come from ``list_params``, which drops short ones.
+    """
+    users = User.objects.annotate(
+        total_goals=Coalesce(F("goal_stats__total_goals"), _goal_count()),
+        completed_goals=Coalesce(
+            F("goal_stats__completed_goals"), _goal_count(status="Completed")
+        ),
+    ).annotate(
+        # A double, so cursors carry the exact value back
+        completion_rate=Cast(
+            Case(
+                When(
+                    total_goals__gt=0,
+                    then=Cast("completed_goals", FloatField()) * 100 / F("total_goals"),
+                ),
+                default=Value(0.0),
+                output_field=FloatField(),
+            ),
+            FloatField(),
+        ),
+    )
+    if query:
+        return search_users(users, query)
+    return users.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+def list_params(params):
+    """
+    (query, sort, query_too_short) from the user list's GET parameters.
+
+    A search sorts by relevance unless another sort was asked for; a query
+    below ``MIN_QUERY_LENGTH`` is dropped and flagged instead.
+    """
+    query = params.get("q", "").strip()
+    query_too_short = bool(query) and len(query) < MIN_QUERY_LENGTH
+    if query_too_short:
+        query = ""
+
+    sort = params.get("sort")
+    if sort not in USER_SORTS or (sort == "relevance" and not query):
+        sort = "relevance" if query else DEFAULT_USER_SORT
+    return query, sort, query_too_short
+
+
+def search_users(users, query):
+    """Narrow ``users`` to ``query`` matches, annotated with ``search_rank``."""
+    table = User._meta.db_table
+
+    if connections[users.db].vendor == "postgresql":
+        # %% is a literal %: pg_trgm's similarity operator
+        return users.filter(
+            RawSQL(
+                f"({table}.username ILIKE %s OR {table}.email ILIKE %s "
+                f"OR {table}.username %% %s OR {table}.email %% %s)",
+                [f"%{_escape_like(query)}%"] * 2 + [query] * 2,
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f"GREATEST(similarity({table}.username, %s), similarity({table}.email, %s))",
+                [query, query],
+                output_field=FloatField(),
+            )
+        )
+
+    return users.filter(
+        Q(username__istartswith=query) | Q(email__istartswith=query)
+    ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+def _escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def estimated_user_count(using="default"):
+    """
+    (count, is_estimate) for the whole user table.
+
+    On Postgres a large table is estimated from the planner statistics
+    (``pg_class.reltuples``) instead of counted.
+    """
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [User._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # -1 until the table has been analyzed
+        if row and row[0] >= EXACT_COUNT_LIMIT:
+            return row[0], True
+    return User.objects.using(using).count(), False
@@ -0,0 +1,105 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from goals.pagination import keyset_page
+from users.directory import USER_SORTS, admin_users, list_params
+
+PAGE_SIZE = 50
+SYLLABLES = ["ka", "lo", "mi", "ran", "tes", "vo", "zu", "bel", "dor", "fin", "gar", "hux"]
+DOMAINS = ["example.com", "mail.test", "lifeline.dev"]
+DEFAULT_QUERIES = ["kalo", "randor", "belfin", "mail.test", "zzzq"]
+
+
+class Rollback(Exception):
+    pass
+
+
+def _fake_user(rng, n):
+    name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+    return User(
+        username=f"{name}{n}",
+        email=f"{name}.{n}@{rng.choice(DOMAINS)}",
+        password="!",  # Unusable
+    )
+
+
+def _legacy_page(query):
+    """The list query before trigram search: icontains over both columns."""
+    users = admin_users().filter(Q(username__icontains=query) | Q(email__icontains=query))
+    return list(users.order_by("id")[:PAGE_SIZE]), users.count()
+
+
+def _current_page(query):
+    query, sort, _ = list_params({"q": query})
+    users = admin_users(query)
+    page = keyset_page(users, sort, page_size=PAGE_SIZE, sorts=USER_SORTS)
+    return page.items, users.count()
+
+
+def _timings(search, query, repeat):
+    search(query)  # Warm the caches
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        search(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(0.95 * (len(samples) - 1))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the staff user search against the old icontains query at several table "
+        "sizes. Synthetic users are inserted in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+            help="User table sizes to measure at.",
+        )
+        parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query.")
+        parser.add_argument("--queries", nargs="+", default=DEFAULT_QUERIES)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, sizes, repeat, queries, seed, **options):
+        rng = random.Random(seed)
+        self.stdout.write(f"Backend: {connection.vendor}")
+        self.stdout.write(
+            f"{'users':>9}  {'query':<10} {'matches':>8}  "
+            f"{'old p50':>8} {'old p95':>8}  {'new p50':>8} {'new p95':>8}"
+        )
+        try:
+            with transaction.atomic():
+                for size in sorted(sizes):
+                    self._grow(rng, size)
+                    for query in queries:
+                        self._measure(size, query, repeat)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def _grow(self, rng, size):
+        n = User.objects.count()
+        while n < size:
+            batch = [_fake_user(rng, i) for i in range(n, min(n + 5000, size))]
+            User.objects.bulk_create(batch, batch_size=5000)
+            n += len(batch)
+        # Fresh statistics, so the planner sees the real table size
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {User._meta.db_table}")
+
+    def _measure(self, size, query, repeat):
+        old_p50, old_p95 = _timings(_legacy_page, query, repeat)
+        new_p50, new_p95 = _timings(_current_page, query, repeat)
+        _, matches = _current_page(query)
+        self.stdout.write(
+            f"{size:>9}  {query:<10} {matches:>8}  "
+            f"{old_p50:>8.2f} {old_p95:>8.2f}  {new_p50:>8.2f} {new_p95:>8.2f}"
+        )
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+# Postgres only: trigram GIN indexes for the staff user search (see
+# users.directory). They serve both ILIKE '%...%' and the similarity
+# operator. SQLite falls back to prefix matching and needs no index.
+FORWARD_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS auth_user_username_trgm "
+    "ON auth_user USING gin (username gin_trgm_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS auth_user_email_trgm "
+    "ON auth_user USING gin (email gin_trgm_ops)",
+]
+
+# The extension is left installed; other objects may use it by now
+REVERSE_SQL = [
+    "DROP INDEX CONCURRENTLY IF EXISTS auth_user_email_trgm",
+    "DROP INDEX CONCURRENTLY IF EXISTS auth_user_username_trgm",
+]
+
+
+def add_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for sql in FORWARD_SQL:
+            schema_editor.execute(sql)
+
+
+def remove_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for sql in REVERSE_SQL:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_trigram_indexes, remove_trigram_indexes),
+    ]
@@ -1,6 +1,7 @@
 from django.db.models.signals import post_save
 from django.contrib.auth.models import User
 from django.dispatch import receiver
+from goals.milestones import provision_user_milestones
 from .models import Profile
 
 @receiver(post_save, sender=User)
@@ -8,6 +9,11 @@ def create_user_profile(sender, instance, created, **kwargs):
     if created:
         Profile.objects.create(user=instance)
 
+@receiver(post_save, sender=User)
+def create_user_milestones(sender, instance, created, **kwargs):
+    if created:
+        provision_user_milestones([instance.id])
+
 @receiver(post_save, sender=User)
 def save_user_profile(sender, instance, **kwargs):
     instance.profile.save()
\ No newline at end of file
@@ -1,3 +1,104 @@
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from goals.models import Goal, UserGoalStats
+from goals.pagination import keyset_page
+
+from .directory import (
+    DEFAULT_USER_SORT, USER_SORTS, admin_users, estimated_user_count, list_params,
+)
+
+
+class AdminUserListTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser("root", "root@example.com", "pw")
+        for i in range(7):
+            user = User.objects.create_user(f"user{i}", f"user{i}@example.com", "pw")
+            for n in range(i % 3):
+                Goal.objects.create(user=user, title=f"Goal {n}", progress=100 if n == 0 else 10)
+
+    def walk(self, sort, page_size=3):
+        seen = []
+        cursor = None
+        while True:
+            page = keyset_page(
+                admin_users(), sort, cursor, page_size, sorts=USER_SORTS, default=DEFAULT_USER_SORT
+            )
+            seen += page.items
+            if not page.has_next:
+                return seen
+            cursor = page.next_cursor
+
+    def test_every_sort_pages_through_each_user_once(self):
+        for sort, (field, descending, _) in USER_SORTS.items():
+            with self.subTest(sort):
+                users = self.walk(sort)
+                self.assertEqual(len({u.id for u in users}), User.objects.count())
+                keys = [(getattr(u, field), u.id) for u in users]
+                self.assertEqual(keys, sorted(keys, reverse=descending))
+
+    def test_goal_counts_and_completion_rate(self):
+        user = admin_users().get(username="user2")
+        self.assertEqual((user.total_goals, user.completed_goals, user.completion_rate), (2, 1, 50.0))
+        self.assertEqual(admin_users().get(username="user0").completion_rate, 0)
+
+    def test_users_without_a_stats_row_are_counted_from_their_goals(self):
+        UserGoalStats.objects.filter(user__username="user2").delete()
+
+        user = admin_users().get(username="user2")
+        self.assertEqual(
+            (user.total_goals, user.completed_goals, user.completion_rate), (2, 1, 50.0)
+        )
+        ranked = list(
+            admin_users().order_by("-total_goals", "id").values_list("username", flat=True)
+        )
+        self.assertLess(ranked.index("user2"), ranked.index("user0"))
+
+    def test_page_is_one_query_and_count_is_exact_on_small_tables(self):
+        self.assertEqual(estimated_user_count(), (8, False))
+
+        self.client.force_login(self.admin)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("admin_dashboard_more"), {"sort": "-completion"})
+        # Session and user lookups, then the annotated page itself
+        self.assertEqual(len(ctx.captured_queries), 3)
+        self.assertIn("goals_usergoalstats", ctx.captured_queries[-1]["sql"])
+
+
+class AdminUserSearchTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser("root", "root@example.com", "pw")
+        for name in ["alice", "alicia", "malice", "bob"]:
+            User.objects.create_user(name, f"{name}@example.com", "pw")
+
+    def test_short_queries_are_dropped(self):
+        self.assertEqual(list_params({"q": " al "}), ("", DEFAULT_USER_SORT, True))
+        self.assertEqual(list_params({"q": "ali"}), ("ali", "relevance", False))
+        self.assertEqual(list_params({"q": "ali", "sort": "-joined"}), ("ali", "-joined", False))
+        # Relevance means nothing without a query
+        self.assertEqual(list_params({"sort": "relevance"}), ("", DEFAULT_USER_SORT, False))
+
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse("admin_dashboard"), {"q": "al"})
+        self.assertTrue(response.context["query_too_short"])
+        self.assertEqual(len(response.context["users"]), 5)
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite fallback")
+    def test_sqlite_matches_username_and_email_prefixes(self):
+        names = set(admin_users("ali").values_list("username", flat=True))
+        self.assertEqual(names, {"alice", "alicia"})
+        self.assertEqual(admin_users("bob@ex").get().username, "bob")
+
+    def test_results_page_in_relevance_order(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse("admin_dashboard"), {"q": "alic"})
+        self.assertEqual(response.context["sort"], "relevance")
 
-# Create your tests here.
+        more = self.client.get(reverse("admin_dashboard_more"), {"q": "alic"}).json()
+        self.assertIn("alice", more["html"])
+        self.assertNotIn("bob", more["html"])
@@ -10,12 +10,21 @@ from .forms import RegisterForm
 from django.contrib.auth.decorators import login_required, user_passes_test
 from supabase import create_client
 from django.conf import settings
-from django.db.models import Q
+from django.http import JsonResponse
+from django.template.loader import render_to_string
+from goals.pagination import keyset_page
+from .directory import (
+    DEFAULT_USER_SORT, MIN_QUERY_LENGTH, USER_SORTS, admin_users, estimated_user_count,
+    list_params,
+)
 
 
 supabase = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
 
 
+ADMIN_USERS_PAGE_SIZE = 50
+
+
 def is_admin(user):
     return user.is_superuser
 
@@ -60,20 +69,46 @@ def admin_dashboard(request):
         return redirect("admin_dashboard")
 
     # Handle GET request (search and display users)
-    query = request.GET.get("q", "").strip()
+    query, sort, query_too_short = list_params(request.GET)
+    users = admin_users(query)
+    page = keyset_page(
+        users, sort, page_size=ADMIN_USERS_PAGE_SIZE,
+        sorts=USER_SORTS, default=DEFAULT_USER_SORT,
+    )
+
     if query:
-        users = User.objects.filter(
-            Q(username__icontains=query) | Q(email__icontains=query)
-        ).order_by("id")
+        user_count, count_is_estimate = users.count(), False
     else:
-        users = User.objects.all().order_by("id")
-
-    user_count = users.count()
+        user_count, count_is_estimate = estimated_user_count()
 
     return render(request, "admin_dashboard.html", {
-        "users": users,
+        "users": page.items,
+        "next_cursor": page.next_cursor,
         "query": query,
+        "sort": sort,
+        "query_too_short": query_too_short,
+        "min_query_length": MIN_QUERY_LENGTH,
         "user_count": user_count,
+        "count_is_estimate": count_is_estimate,
+    })
+
+
+@login_required
+@user_passes_test(is_admin)
+def admin_dashboard_more(request):
+    query, sort, _ = list_params(request.GET)
+    page = keyset_page(
+        admin_users(query),
+        sort,
+        request.GET.get("cursor"),
+        page_size=ADMIN_USERS_PAGE_SIZE,
+        sorts=USER_SORTS,
+        default=DEFAULT_USER_SORT,
+    )
+
+    return JsonResponse({
+        "html": render_to_string("admin_user_rows.html", {"users": page.items}, request=request),
+        "next_cursor": page.next_cursor,
     })
 
 